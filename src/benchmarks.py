@@ -0,0 +1,162 @@
+"""
+Enthält Laufzeitmessungen für rechenintensive Programmteile. Die Messungen arbeiten ausschließlich mit künstlich
+erzeugten Konfigurationen in einem temporären Verzeichnis und verändern WG_DIR nicht.
+Aufruf aus dem Verzeichnis src mit: python3 -m benchmarks
+"""
+
+# Es gibt ein Problem mit der Erkennung von lokalen Modulen durch pylint. Daher:
+# pylint: disable=import-error
+
+# Imports aus Standardbibliotheken
+import base64  # Für die Erzeugung von künstlichen Schlüsseln
+import contextlib  # Für das Unterdrücken von Ausgaben während der Messungen
+import os  # Für Dateisystemzugriffe
+import sys
+import tempfile  # Für das temporäre Verzeichnis der Messungen
+import time  # Für die Zeitmessung
+import tracemalloc  # Für die Messung des Speicherbedarfs
+
+# Imports von Drittanbietern
+
+# Eigene Imports
+from client_config import ClientConfig
+from exporting import config_to_str
+from importing import parse_and_import
+from server_config import ServerConfig
+
+
+def fake_key(number):
+    """
+    Gibt einen base64 kodierten, 32 Byte langen künstlichen Schlüssel zurück. Die Schlüssel sind für unterschiedliche
+    Werte von number eindeutig, aber kryptographisch wertlos.
+    """
+    return base64.b64encode(number.to_bytes(32, "big")).decode()
+
+
+def write_server_config_file(filename, number_of_peers):
+    """
+    Schreibt eine Serverkonfiguration mit number_of_peers Peer-Sektionen in die Datei filename. Gibt die Anzahl der
+    geschriebenen Zeilen zurück.
+    """
+    lines = ["[Interface]", "# Name = Benchmark", "Address = 10.0.0.1/8", "ListenPort = 51820",
+             f"PrivateKey = {fake_key(0)}"]
+    for index in range(1, number_of_peers + 1):
+        lines.extend(["", "[Peer]", f"# Name = Client {index}", f"AllowedIPs = 10.{index >> 16 & 255}."
+                      f"{index >> 8 & 255}.{index & 255}/32", f"PublicKey = {fake_key(index)}"])
+
+    with open(filename, "w", encoding='utf-8') as config_file:
+        config_file.write("\n".join(lines) + "\n")
+
+    return len(lines)
+
+
+def benchmark_parse_and_import(number_of_peers, as_server):
+    """
+    Misst den Import einer Konfiguration mit number_of_peers Peer-Sektionen. Bei as_server=True wird die Datei als
+    Serverkonfiguration importiert und jeder Peer-Sektion ist ein passender Client zugeordnet. Andernfalls wird sie als
+    Clientkonfiguration importiert, dann wird ausschließlich das Zerlegen der Zeilen gemessen. Gibt die Anzahl der
+    verarbeiteten Zeilen pro Sekunde zurück.
+    """
+    with tempfile.TemporaryDirectory() as dirname:
+        if as_server:
+            peer = ServerConfig()
+            for index in range(1, number_of_peers + 1):
+                peer.clients.append(ClientConfig())
+                peer.clients[-1].client_publickey = fake_key(index)
+        else:
+            peer = ClientConfig()
+
+        peer.filename = os.path.join(dirname, "wg0.conf")
+        number_of_lines = write_server_config_file(peer.filename, number_of_peers)
+
+        # Hinweise auf die abweichende Serverkonfiguration werden nicht ausgegeben
+        with open(os.devnull, "w", encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            parse_and_import(peer)
+            duration = time.perf_counter() - start
+
+    return number_of_lines / duration
+
+
+def create_server_config(number_of_peers):
+    """
+    Gibt eine ServerConfig mit number_of_peers Clients zurück. Die Parameter entsprechen denen aus
+    write_server_config_file.
+    """
+    server = ServerConfig()
+    server.name = "Benchmark"
+    server.address = "10.0.0.1/8"
+    server.listenport = "51820"
+    server.privatekey = fake_key(0)
+    for index in range(1, number_of_peers + 1):
+        client = ClientConfig()
+        client.name = f"Client {index}"
+        client.client_allowedips = f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}/32"
+        client.client_publickey = fake_key(index)
+        server.clients.append(client)
+    return server
+
+
+def benchmark_config_to_str(number_of_peers):
+    """
+    Misst die Ausgabe einer Serverkonfiguration mit number_of_peers Peer-Sektionen als Zeichenkette. Gibt die Anzahl
+    der ausgegebenen Peer-Sektionen pro Sekunde zurück.
+    """
+    server = create_server_config(number_of_peers)
+
+    start = time.perf_counter()
+    config_to_str(server, 0)
+    duration = time.perf_counter() - start
+
+    return number_of_peers / duration
+
+
+def benchmark_client_memory(number_of_clients, as_bytes=True):
+    """
+    Misst den Speicherbedarf von number_of_clients Clients mit je einem privaten und einem öffentlichen Schlüssel
+    sowie dem gemeinsamen öffentlichen Schlüssel des Servers. Bei as_bytes=False werden die Schlüssel wie vor der
+    Einführung von KeyAttribute als Zeichenketten hinterlegt. Gibt den Speicherbedarf pro Client in Bytes zurück.
+    """
+    server_publickey = fake_key(0)
+
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    clients = []
+    for index in range(1, number_of_clients + 1):
+        client = ClientConfig()
+        values = {"privatekey": fake_key(2 * index), "client_publickey": fake_key(2 * index + 1),
+                  "publickey": server_publickey}
+        for name, value in values.items():
+            if as_bytes:
+                setattr(client, name, value)
+            else:
+                client.__dict__[name] = value
+        clients.append(client)
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    return size / number_of_clients
+
+
+def main():
+    """
+    Führt alle Messungen aus und gibt die Ergebnisse auf der Konsole aus.
+    """
+    for as_server in (False, True):
+        for number_of_peers in (1000, 10000):
+            lines_per_second = benchmark_parse_and_import(number_of_peers, as_server)
+            print(f"parse_and_import ({'Server' if as_server else 'Client'}), {number_of_peers:>6} Peers: "
+                  f"{lines_per_second:>12,.0f} Zeilen/s")
+
+    for number_of_peers in (1000, 10000, 100000):
+        peers_per_second = benchmark_config_to_str(number_of_peers)
+        print(f"config_to_str (Server), {number_of_peers:>6} Peers: {peers_per_second:>12,.0f} Peers/s")
+
+    for as_bytes in (False, True):
+        bytes_per_client = benchmark_client_memory(100000, as_bytes)
+        print(f"ClientConfig ({'Bytes' if as_bytes else 'str'}), 100000 Clients: {bytes_per_client:>12,.0f} "
+              "Bytes/Client")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
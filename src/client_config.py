@@ -2,6 +2,59 @@
 Enthält die Klassendefinition von Clientkonfigurationen
 """
 
+# Es gibt ein Problem mit der Erkennung von lokalen Modulen durch pylint. Daher:
+# pylint: disable=import-error
+
+# Imports aus Standardbibliotheken
+import base64
+
+# Eigene Imports
+from constants import CONFIG_PARAMETERS
+from constants import PEER_CONFIG_PARAMETERS
+from file_management import get_file_signature
+from keys import key_to_bytes
+
+# Attribute, welche in der Client- oder Serverkonfiguration ausgegeben werden. Eine Änderung verwirft die
+# zwischengespeicherten Ausgaben im Attribut rendered.
+RENDERED_ATTRIBUTES = frozenset(["name"] + [parameter.lower() for parameter in CONFIG_PARAMETERS] +
+                                ["client_" + parameter.lower() for parameter in PEER_CONFIG_PARAMETERS])
+
+
+class KeyAttribute:
+    """
+    Deskriptor für die Schlüssel einer Clientkonfiguration. Base64 kodierte Schlüssel werden als 32 Bytes unter
+    demselben Namen im Objekt hinterlegt und erst beim Lesen kodiert. Andere Werte, z.B. "", werden unverändert
+    hinterlegt. Wiederholt gesetzte gleiche Schlüssel (z.B. der öffentliche Schlüssel des Servers in allen Clients)
+    verwenden dasselbe bytes-Objekt.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name  # pylint: disable=attribute-defined-outside-init
+        self.last = ("", "")  # Zuletzt gesetzter base64 kodierter Schlüssel und dessen Bytes
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            value = instance.__dict__[self.name]
+        except KeyError:
+            # Ermöglicht das Nachladen in LazyClientConfig.__getattr__
+            raise AttributeError(self.name) from None
+        if isinstance(value, bytes):
+            return base64.b64encode(value).decode()
+        return value
+
+    def __set__(self, instance, value):
+        last = self.last
+        if value == last[0]:
+            raw = last[1]
+        else:
+            raw = key_to_bytes(value)
+            # Nur Schlüssel werden vorgehalten, damit z.B. "" aus __init__ den Schlüssel des Servers nicht verdrängt
+            if isinstance(raw, bytes):
+                self.last = (value, raw)
+        instance.__dict__[self.name] = raw
+
 
 class ClientConfig:
     """
@@ -15,6 +68,11 @@ class ClientConfig:
     # Eine Klasse ist für diesen Anwendungsfall am besten geeignet.
     # pylint: disable=too-few-public-methods
 
+    # Schlüssel werden als 32 Bytes hinterlegt, vgl. KeyAttribute
+    privatekey = KeyAttribute()
+    publickey = KeyAttribute()
+    client_publickey = KeyAttribute()
+
     def __init__(self):
         self.name = ""  # Die Bezeichnung des Clients ("friendly name").
         self.filename = ""  # Der Dateiname inkl. Dateiendung.
@@ -36,3 +94,82 @@ class ClientConfig:
         self.client_endpoint = ""  # Externe IP-Adresse oder Hostname des Clients aus Sicht des Servers.
         self.client_persistentkeepalive = ""  # Abstand zwischen zwei vom Server gesendeten Erreichbarkeitssignalen
         self.client_allowedips = ""  # Zugelassene IP-Adressen des Verbindungspartners.
+        self.dirty = True  # Gibt an, ob die Konfiguration seit dem letzten Import oder Export verändert wurde.
+        self.rendered = {}  # Zwischengespeicherte Ausgaben der Konfiguration, vgl. exporting.server_peer_to_str.
+
+    def __setattr__(self, name, value):
+        """
+        Setzt ein Attribut. Betrifft die Änderung die Ausgabe der Konfiguration, werden die zwischengespeicherten
+        Ausgaben verworfen.
+        """
+        if name in RENDERED_ATTRIBUTES:
+            self.__dict__["rendered"] = {}
+        object.__setattr__(self, name, value)
+
+    def get_raw_key(self, name):
+        """
+        Gibt den Schlüssel name (privatekey, publickey oder client_publickey) als 32 Bytes zurück, bzw. den
+        unveränderten Wert, falls es sich um keinen gültigen Schlüssel handelt.
+        """
+        if name not in self.__dict__:
+            # Lädt bei einer LazyClientConfig ggf. die übrigen Parameter
+            getattr(self, name)
+        return self.__dict__[name]
+
+
+class LazyClientConfig(ClientConfig):
+    """
+    Clientkonfiguration, von welcher beim Import nur die Bezeichnung, Address und PrivateKey eingelesen werden
+    (vgl. importing.parse_and_import mit identity_only=True). Alle übrigen Parameter werden beim ersten Zugriff auf
+    eines der fehlenden Attribute ab der Position rest_offset aus der Datei source_filename eingelesen, auch wenn
+    filename inzwischen geändert wurde. Die Datei darf bis dahin nicht verändert werden, andernfalls schlägt das
+    Einlesen fehl (vgl. load).
+    """
+
+    # pylint: disable=super-init-not-called
+    def __init__(self):
+        # ClientConfig.__init__ wird bewusst nicht aufgerufen, die übrigen Attribute werden erst bei Bedarf angelegt.
+        self.name = ""  # Die Bezeichnung des Clients ("friendly name").
+        self.filename = ""  # Der Dateiname inkl. Dateiendung.
+        self.source_filename = ""  # Der Dateiname beim Import. Bleibt bei einer Änderung von filename erhalten.
+        self.address = ""  # Die Hostadresse des Clients im VPN.
+        self.privatekey = ""  # Der private Schlüssel des Clients, base64 kodiert.
+        self.client_publickey = ""  # Öffentlicher Schlüssel des Clients.
+        self.dirty = True  # Gibt an, ob die Konfiguration seit dem letzten Import oder Export verändert wurde.
+        self.rendered = {}  # Zwischengespeicherte Ausgaben der Konfiguration, vgl. exporting.server_peer_to_str.
+        self.rest_offset = 0  # Position in der Datei für das Einlesen der übrigen Parameter. None: vollständig.
+        self.signature = None  # Dateimerkmale beim Import, vgl. file_management.get_file_signature.
+
+    def __getattr__(self, name):
+        """
+        Wird nur für nicht vorhandene Attribute aufgerufen. Liest die übrigen Parameter ein, falls notwendig.
+        """
+        # Interne Attribute von Python (z.B. bei copy und pickle) lösen kein Einlesen aus
+        if name.startswith("__") or self.__dict__.get("rest_offset") is None:
+            raise AttributeError(name)
+
+        self.load()
+        return getattr(self, name)
+
+    def load(self):
+        """
+        Liest die übrigen Parameter aus der Datei ein. Wurde die Datei seit dem Import verändert, ersetzt oder entfernt,
+        wird ein OSError ausgelöst, da rest_offset nicht mehr gültig ist.
+        """
+        # Import innerhalb der Methode, da importing dieses Modul importiert
+        from importing import parse_and_import  # pylint: disable=import-outside-toplevel
+
+        if self.signature is not None and get_file_signature(self.source_filename) != self.signature:
+            raise OSError(f"Die Datei {self.source_filename} wurde seit dem Import verändert.")
+
+        parse_and_import(self, check=False)
+        self.complete()
+
+    def complete(self):
+        """
+        Legt alle noch fehlenden Attribute mit den Standardwerten von ClientConfig an. Danach gilt die Konfiguration
+        als vollständig eingelesen.
+        """
+        for key, value in vars(ClientConfig()).items():
+            self.__dict__.setdefault(key, value)
+        self.rest_offset = None
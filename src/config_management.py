@@ -6,9 +6,21 @@ Enthält alle Funktionen für das Verwalten und Anzeigen von importierten Konfig
 # pylint: disable=import-error
 
 # Imports aus Standardbibliotheken
+from concurrent.futures import ProcessPoolExecutor  # Für die parallele Erzeugung von QR-Codes und Schlüsselpaaren
+from contextlib import ExitStack
+import csv  # Für die Ausgabe der erneuerten Schlüssel
+import hashlib  # Für die Dateinamen der QR-Codes
+import importlib.util  # Für die Prüfung, ob Pillow installiert ist
 import io
 from ipaddress import ip_address, ip_network, ip_interface  # Für netzwerktechnische Prüfungen
+from itertools import repeat
+import multiprocessing  # Für die Startmethode der Prozesse
+import os
+from pathlib import Path
 import re  # Für das Parsen von Konfigurationsdateien
+from shutil import copy2
+import sys
+from tempfile import mkstemp
 
 # Imports von Drittanbietern
 from colorama import Style
@@ -17,16 +29,34 @@ import qrcode
 # Eigene Imports
 from client_config import ClientConfig
 from constants import CONFIG_PARAMETERS
+from constants import DEBUG
 from constants import MINIMAL_CONFIG_PARAMETERS
 from constants import INTERFACE_CONFIG_PARAMETERS
+from constants import KEEP_ADDRESSES_ON_RESIZE
+from constants import KEY_POOL_SIZE
+from constants import KEY_ROTATION_WORKERS
+from constants import PROCESS_START_METHOD
+from constants import QR_CACHE_DIR
+from constants import QR_OUTPUT_DIR
+from constants import QR_WORKERS
 from constants import RE_MATCH_KEY
 from constants import RE_MATCH_KEY_VALUE
+from constants import WG_DIR
 from debugging import console
+from exporting import client_config_to_str
 from exporting import config_to_str
+from exporting import export_configurations
+from exporting import get_client_config_filename
+from networking import AddressAllocator
+from networking import build_address_allocator
 from networking import get_cidr_mask_from_hosts
+from networking import is_host_in_network
 from server_config import ServerConfig
 import keys
 
+# Vorrat an Schlüsselpaaren für neue Clients und neue Schlüsselpaare, vgl. get_keypair
+KEY_POOL = keys.KeyPool(KEY_POOL_SIZE) if KEY_POOL_SIZE > 0 else None
+
 
 def print_configuration(server):
     """
@@ -61,14 +91,55 @@ def print_configuration(server):
         pos = pos + 1
 
 
+def get_keypair():
+    """
+    Gibt ein neues Schlüsselpaar (keys.Keypair) zurück. Ist KEY_POOL_SIZE größer 0, wird es dem Vorrat KEY_POOL
+    entnommen, welcher im Hintergrund aufgefüllt wird.
+    """
+    if KEY_POOL is not None:
+        return KEY_POOL.get()
+    return keys.generate_keypairs(1)[0]
+
+
+def get_address_allocator(server):
+    """
+    Gibt den AddressAllocator des VPN-Netzwerks zurück. Dieser wird beim Import erstellt und bei einer Änderung des
+    Netzwerks, z.B. durch change_network_size, neu aufgebaut.
+    """
+    server_address = ip_interface(server.address)
+    if server.addresses is None or server.addresses.network != server_address.network:
+        server.addresses, conflicts = build_address_allocator(server_address.network, server_address.ip,
+                                                              server.clients)
+        for index in conflicts:
+            console("Es liegt ein IP-Adresskonflikt vor.", "Client " + str(index), "verwendet eine bereits vergebene "
+                    "IP-Adresse.", mode="warn", perm=True)
+    return server.addresses
+
+
+def find_client_by_address(server, address):
+    """
+    Gibt die Nummer (ab 1) des ersten Clients mit der IP-Adresse address zurück, bzw. None. Wird nur für Meldungen bei
+    einem bereits erkannten IP-Adresskonflikt verwendet.
+    """
+    return next((index for index, client in enumerate(server.clients, 1) if client.address == address), None)
+
+
 def calculate_publickey(client):
     """
     Berechnet die öffentlichen Schlüssel der Clients anhand der privaten Schlüssel.
     """
-    client.client_publickey = keys.pubkey(client.privatekey)
+    # Liegt der private Schlüssel als Bytes vor, entfällt das Dekodieren und Kodieren, vgl. KeyAttribute
+    privatekey = client.get_raw_key("privatekey")
+    if isinstance(privatekey, bytes):
+        client.client_publickey = keys.public_bytes(privatekey)
+    else:
+        client.client_publickey = keys.pubkey(privatekey)
 
-    console("Öffentlicher Schlüssel", client.client_publickey[:5] + "...", "für privaten Schlüssel",
-            client.privatekey[:5] + "...", "berechnet und hinterlegt.", mode="succ")
+    # Nur mit DEBUG, da bereits das Zusammensetzen der Argumente beide Schlüssel base64 kodiert, was den Vorteil der
+    # Bytes-Darstellung zunichtemachen würde
+    if DEBUG:
+        console("Öffentlicher Schlüssel", client.client_publickey[:5] + "...", "für privaten Schlüssel",
+                client.privatekey[:5] + "...", "berechnet und hinterlegt.", mode="succ")
 
 
 def insert_client(server):
@@ -82,8 +153,9 @@ def insert_client(server):
     new_client = ClientConfig()
 
     # Ein Schlüsselpaar wird generiert und hinterlegt.
-    new_client.privatekey = keys.genkey()
-    new_client.client_publickey = keys.pubkey(new_client.privatekey)
+    keypair = get_keypair()
+    new_client.privatekey = keypair.private_bytes
+    new_client.client_publickey = keypair.public_bytes
 
     # Der öffentliche Schlüssel des Servers wird hinterlegt
     new_client.publickey = keys.pubkey(server.privatekey)
@@ -104,9 +176,13 @@ def insert_client(server):
     else:
         new_client.name = name
 
-    # Eingabe einer IP-Adresse
+    # Eingabe einer IP-Adresse. Vorgeschlagen wird die nächste freie Adresse im VPN-Netzwerk
     # Hier kann ein IP-Adresskonflikt auftreten, der Benutzer wird allerdings gewarnt
-    defaultip = "192.168.0." + str(len(server.clients)+1)
+    addresses = get_address_allocator(server)
+    defaultip = addresses.next_free()
+    if defaultip is None:
+        console("Im VPN-Netzwerk", server.address.network, "ist keine IP-Adresse mehr frei.", mode="warn", perm=True)
+        defaultip = ""
     while True:
         try:
             address = input(f"{Style.BRIGHT}Client anlegen (IP-Adresse?) [{defaultip}] > {Style.RESET_ALL}")
@@ -114,7 +190,7 @@ def insert_client(server):
             console("Ungültige Eingabe. Bitte keine Akzente eingeben.", mode="err", perm=True)
             continue
         if address == "":
-            address = defaultip  # Schlägt "automatisch" fehl, wenn mehr als 254 Clients auf diese Weise erstellt werden
+            address = str(defaultip)
         try:
             new_client.address = ip_address(address)
         except ValueError:
@@ -123,21 +199,17 @@ def insert_client(server):
         break
 
     # Befindet sich die angegebene IP-Adresse im Subnetz des VPN-Servers?
-    if new_client.address not in list(server.address.network.hosts()):
+    if not is_host_in_network(new_client.address, server.address.network):
         console("IP-Adresse", new_client.address, "ist nicht Teil des VPN-Netzwerks", server.address.network,
                 mode="warn", perm=True, no_space=False)
 
     # Auf IP-Adresskonflikte prüfen
     if server.address.ip == new_client.address:
         console("Es liegt ein IP-Adresskonflikt vor. Der Server verwendet dieselbe IP-Adresse.", mode="warn", perm=True)
-
-    index = 0
-    for client in server.clients:
-        console("Prüfe auf Übereinstimmung von", client.address, "mit", new_client.address, mode="info")
-        index = index + 1
-        if client.address == new_client.address:
-            console("Es liegt ein IP-Adresskonflikt vor.", "Client " + str(index), "verwendet dieselbe IP-Adresse.",
-                    mode="warn", perm=True)
+    elif new_client.address in addresses:
+        index = find_client_by_address(server, new_client.address)
+        console("Es liegt ein IP-Adresskonflikt vor.", "Client " + str(index), "verwendet dieselbe IP-Adresse.",
+                mode="warn", perm=True)
 
     # Parameter AllowedIPs auf IP-Adresse des Servers setzen. Damit wird standardmäßig nur Datenverkehr zum Server über
     # das VPN geleitet
@@ -191,8 +263,11 @@ def insert_client(server):
     # durch den Tunnel geleitet wird
     new_client.client_allowedips = new_client.address
 
-    # Clientkonfiguration zur Serverkonfiguration hinzufügen
+    # Clientkonfiguration zur Serverkonfiguration hinzufügen. Der neue Client ist durch die Initialisierung bereits als
+    # verändert markiert, die Serverkonfiguration erhält eine neue Peer-Sektion.
     server.clients.append(new_client)
+    addresses.reserve(new_client.address)
+    server.dirty = True
     console("Client zur Konfiguration hinzugefügt.", mode="succ")
 
 
@@ -208,7 +283,18 @@ def delete_client(server, choice):
         console("Breche ab.", mode="err", perm=True)
         return
 
+    # QR-Codes der Konfiguration enthalten den privaten Schlüssel und werden entfernt
+    remove_qr_codes(server, [server.clients[client_id - 1]])
+
+    # Die Datei des Clients wird beim nächsten Export entfernt
+    if server.clients[client_id - 1].filename != "":
+        server.removed_filenames.append(server.clients[client_id - 1].filename)
+
+    # Die IP-Adresse des Clients wird wieder frei
+    get_address_allocator(server).release(server.clients[client_id - 1].address)
+
     del server.clients[client_id - 1]
+    server.dirty = True
 
 
 def change_client(server, choice):
@@ -258,6 +344,10 @@ def change_client(server, choice):
                 if key.lower() in interface_config_parameters:
                     # Falls ja, übernehme den Wert des Parameters in der Datenstruktur
                     setattr(server, key.lower(), value)
+                    server.dirty = True
+                    if key.lower() == "address":
+                        # Die belegten Hostadressen werden bei Bedarf neu erfasst, vgl. get_address_allocator
+                        server.addresses = None
                     console("Parameter hinterlegt.", mode="succ")
                 else:
                     console("Unbekannter Parameter", input_line, mode="warn", perm="True")
@@ -309,17 +399,41 @@ def change_client(server, choice):
                 console("Prüfe, ob der Parameter in der Menge der unterstützten Parameter enthalten ist.", mode="info")
 
                 # Prüfe, ob der Parameter grundsätzlich gültig ist
-                if key.lower() in config_parameters:
+                if key.lower() == "address":
+                    # Die IP-Adresse wird wie beim Import ohne CIDR-Maske hinterlegt und im AddressAllocator belegt
+                    try:
+                        address = ip_address(ip_interface(value).ip)
+                    except ValueError:
+                        console("Ungültige Eingabe. Eingabe einer IPv4-Adresse erwartet.", mode="err", perm=True)
+                        continue
+                    addresses = get_address_allocator(server)
+                    addresses.release(server.clients[client_id-1].address)
+                    if not addresses.reserve(address):
+                        console("Es liegt ein IP-Adresskonflikt vor.", "Die IP-Adresse", address, "ist bereits "
+                                "vergeben.", mode="warn", perm=True)
+                    server.clients[client_id-1].address = address
+                    server.clients[client_id-1].dirty = True
+                    console("Parameter hinterlegt", mode="succ")
+
+                elif key.lower() in config_parameters:
                     # Falls ja, übernehme den Wert des Parameters in der Datenstruktur
                     setattr(server.clients[client_id-1], key.lower(), value)
+                    server.clients[client_id-1].dirty = True
                     console("Parameter hinterlegt", mode="succ")
 
                 elif key.lower() == "name":
+                    # Die Bezeichnung ist auch Teil der Peer-Sektion in der Serverkonfiguration
                     setattr(server.clients[client_id-1], key.lower(), value)
+                    server.clients[client_id-1].dirty = True
+                    server.dirty = True
                     console("Bezeichnung hinterlegt", mode="succ")
 
                 elif key.lower() == "filename":
+                    # Die Datei unter dem bisherigen Namen wird beim nächsten Export entfernt
+                    if server.clients[client_id - 1].filename not in ("", value):
+                        server.removed_filenames.append(server.clients[client_id - 1].filename)
                     setattr(server.clients[client_id - 1], key.lower(), value)
+                    server.clients[client_id - 1].dirty = True
                     console("Bezeichnung hinterlegt", mode="succ")
 
                 else:
@@ -426,11 +540,14 @@ def change_client_keypair(server, choice):
     if choice == "0":
         console("Ändere das Schlüsselpaar des Servers.", mode="info")
 
-        server.privatekey = keys.genkey()
-        publickey = keys.pubkey(server.privatekey)
+        keypair = get_keypair()
+        server.privatekey = keypair.privatekey
+        publickey = keypair.publickey
+        server.dirty = True
 
         for client in server.clients:
             client.publickey = publickey
+            client.dirty = True
 
     else:
         # Parameterprüfungen
@@ -441,16 +558,88 @@ def change_client_keypair(server, choice):
 
         console("Ändere das Schlüsselpaar des Clients", client_id, ".", mode="info")
 
-        server.clients[client_id-1].privatekey = keys.genkey()
-        server.clients[client_id-1].client_publickey = keys.pubkey(server.clients[client_id-1].privatekey)
+        # QR-Codes mit dem bisherigen privaten Schlüssel entfernen
+        remove_qr_codes(server, [server.clients[client_id-1]])
+
+        keypair = get_keypair()
+        server.clients[client_id-1].privatekey = keypair.private_bytes
+        server.clients[client_id-1].client_publickey = keypair.public_bytes
+        server.clients[client_id-1].dirty = True
+
+        # Der öffentliche Schlüssel ist Teil der Peer-Sektion in der Serverkonfiguration
+        server.dirty = True
+
+
+def rotate_client_keypairs(server, client_filter=None, workers=KEY_ROTATION_WORKERS, mapping_target=None,
+                           export=True):
+    """
+    Generiert neue Schlüsselpaare für alle Clients oder, falls angegeben, für alle Clients, für welche
+    client_filter(client) True zurückgibt. Die Schlüsselpaare werden mit workers Prozessen erzeugt, bei None mit einem
+    Prozess pro Prozessorkern, bei 1 im Hauptprozess. privatekey und client_publickey werden gemeinsam ersetzt.
+    Mit export werden die Konfigurationen anschließend in einem einzigen Export geschrieben. Gibt ein dict mit den
+    bisherigen und den neuen öffentlichen Schlüsseln zurück. Ist mapping_target angegeben (Dateiname, Textstrom oder
+    "-" für die Standardausgabe), wird die Zuordnung zusätzlich im CSV-Format mit den Spalten name, old_publickey und
+    new_publickey ausgegeben.
+    """
+
+    clients = [client for client in server.clients if client_filter is None or client_filter(client)]
+    if len(clients) == 0:
+        console("Keine Clients ausgewählt.", mode="warn", perm=True)
+        return {}
 
+    console("Erneuere die Schlüsselpaare von", len(clients), "Clients.", mode="info", perm=True)
 
-def change_network_size(server, choice):
+    # QR-Codes mit den bisherigen privaten Schlüsseln entfernen
+    remove_qr_codes(server, clients)
+
+    # Die Schlüsselpaare werden in Blöcken erzeugt, um den Aufwand für die Kommunikation gering zu halten
+    if workers is None or workers > 1:
+        number_of_workers = workers or os.cpu_count() or 1
+        chunk = max(1, -(-len(clients) // (4 * number_of_workers)))
+        sizes = [min(chunk, len(clients) - start) for start in range(0, len(clients), chunk)]
+        with ProcessPoolExecutor(max_workers=number_of_workers,
+                                 mp_context=multiprocessing.get_context(PROCESS_START_METHOD)) as executor:
+            keypairs = [keypair for block in executor.map(keys.generate_keypairs, sizes) for keypair in block]
+    else:
+        keypairs = keys.generate_keypairs(len(clients))
+
+    mapping = {}
+    for client, keypair in zip(clients, keypairs):
+        if client.client_publickey != "":
+            mapping[client.client_publickey] = keypair.publickey
+        client.privatekey = keypair.private_bytes
+        client.client_publickey = keypair.public_bytes
+        client.dirty = True
+
+    # Die öffentlichen Schlüssel sind Teil der Peer-Sektionen in der Serverkonfiguration
+    server.dirty = True
+
+    if mapping_target is not None:
+        names = {keypair.publickey: client.name for client, keypair in zip(clients, keypairs)}
+        with ExitStack() as stack:
+            if mapping_target == "-":
+                stream = sys.stdout
+            elif isinstance(mapping_target, str):
+                stream = stack.enter_context(open(mapping_target, "w", encoding='utf-8', newline=""))
+            else:
+                stream = mapping_target
+            writer = csv.writer(stream)
+            writer.writerow(("name", "old_publickey", "new_publickey"))
+            writer.writerows((names[new], old, new) for old, new in mapping.items())
+
+    if export:
+        export_configurations(server)
+
+    return mapping
+
+
+def change_network_size(server, choice, keep_addresses=KEEP_ADDRESSES_ON_RESIZE):
     """
     Diese Funktion ändert die Netzwerkgröße des VPN-Netzwerks. Der Parameter server übergibt der Funktion ein Objekt vom
     Typ ServerConfig. Der Parameter number_of_hosts gibt an, wie viele Hosts (Clients + Server) das Netzwerk ausgelegt
     werden soll. Anhand dieser Angabe wird die notwendige Netzwerkmaske berechnet und eine geeignete Netzwerkklasse
-    festgelegt.
+    festgelegt. Bei keep_addresses=True behalten Server und Clients ihre IP-Adressen, sofern diese im neuen Netzwerk
+    gültig und eindeutig sind. Nur die übrigen Clients erhalten neue Adressen und werden als verändert markiert.
     """
 
     # Parameterprüfungen
@@ -497,33 +686,74 @@ def change_network_size(server, choice):
         console("Berechnung des Subnets ungültig. Breche ab.", mode="err", perm=True)
         return
 
+    # Das Netzwerk der neuen Größe mit der bisherigen Adresse des Servers wird bevorzugt, sofern es privat ist
+    old_server_address = ip_interface(server.address)
+    if keep_addresses:
+        current_network = ip_network(f"{old_server_address.ip}/{cidr_mask}", strict=False)
+        if current_network.is_private:
+            ip4_network = current_network
+
     console("Neues Subnetz", ip4_network, "wird verwendet.", mode="succ")
 
-    list_of_host_addr = list(ip4_network.hosts())
+    # Die Adressen werden über einen AddressAllocator vergeben, ohne die Hostadressen im Arbeitsspeicher aufzuzählen
+    addresses = AddressAllocator(ip4_network)
+    if keep_addresses and is_host_in_network(old_server_address.ip, ip4_network):
+        server_address = old_server_address.ip
+    else:
+        server_address = ip_address(addresses.last_host)
 
-    # Dem Server die letzte IP-Adresse im Subnetz zuweisen
+    # Dem Server die bisherige bzw. die letzte IP-Adresse im Subnetz zuweisen
     try:
-        console("Weise dem Server die IP-Adresse", f"{list_of_host_addr[-1]}/{cidr_mask}", "zu.", mode="info")
-        server.address = ip_interface(f"{list_of_host_addr[-1]}/{cidr_mask}")
+        console("Weise dem Server die IP-Adresse", f"{server_address}/{cidr_mask}", "zu.", mode="info")
+        server.address = ip_interface(f"{server_address}/{cidr_mask}")
+        addresses.reserve(server_address)
+        server.addresses = addresses
     except AttributeError:
         console("Es ist keine Serverkonfiguration vorhanden. Neue erstellen oder importieren. Breche ab.",
                 mode="err", perm=True)
 
-    # Den Clients vom Anfang aufsteigende Adressen zuweisen
-    index = 0
-    for client in server.clients:
-        client.address = list_of_host_addr[index]
-        index = index + 1
+    # Gültige und eindeutige Adressen werden zuerst belegt, damit neue Adressen nur in den Lücken vergeben werden
+    if keep_addresses:
+        renumbered_clients = []
+        for client in server.clients:
+            if is_host_in_network(client.address, ip4_network) and client.address not in addresses:
+                addresses.reserve(client.address)
+            else:
+                renumbered_clients.append(client)
+    else:
+        renumbered_clients = server.clients
+
+    # Den übrigen Clients vom Anfang aufsteigende Adressen zuweisen
+    for client in renumbered_clients:
+        client.address = addresses.allocate()
 
         # Parameter AllowedIPs der Peer-Sektion des Servers muss ebenfalls angepasst werden. Andernfalls werden falsche
         # Routen erstellt und es ist keine Datenübertragung möglich.
         client.client_allowedips = client.address
-
-        # Parameter AllowedIPs in den Peer-Sektionen der Clients muss aus dem selben Grund angepasst werden
-        client.allowedips = server.address
+        client.dirty = True
 
         console("Weise Client mit privatem Schlüssel", f"{client.privatekey:5}" + "...", "die IP-Adresse",
-                list_of_host_addr[index], "zu.", mode="info")
+                client.address, "zu.", mode="info")
+
+    # Parameter AllowedIPs in den Peer-Sektionen der Clients muss aus dem selben Grund angepasst werden. Bei
+    # keep_addresses werden nur Werte angepasst, welche auf die bisherige Adresse des Servers verweisen.
+    for client in server.clients:
+        if not keep_addresses:
+            client.allowedips = server.address
+            client.dirty = True
+        elif str(client.allowedips) == str(old_server_address) and old_server_address != server.address:
+            client.allowedips = server.address
+            client.dirty = True
+        elif str(client.allowedips) == str(old_server_address.ip) and old_server_address.ip != server.address.ip:
+            client.allowedips = server.address.ip
+            client.dirty = True
+
+    # Die Serverkonfiguration enthält die eigene Adresse sowie die Adressen der Clients in den Peer-Sektionen
+    if server.address != old_server_address or len(renumbered_clients) > 0:
+        server.dirty = True
+
+    console(len(renumbered_clients), "von", len(server.clients), "Clients erhalten eine neue IP-Adresse.", mode="info",
+            perm=True)
 
 
 def print_qr_code(server, choice):
@@ -547,6 +777,157 @@ def print_qr_code(server, choice):
     print(output.read())
 
 
+def generate_qr_codes(server, choices=None, image_format="svg", output_dir=None, workers=QR_WORKERS):
+    """
+    Erzeugt QR-Codes der Konfigurationen der Clients mit den IDs in choices (Standard: alle Clients) als Bilddateien
+    im Format image_format ("svg" oder "png", letzteres erfordert Pillow). Die Bilder werden im Verzeichnis
+    WG_DIR + QR_CACHE_DIR unter dem SHA-256 Hashwert der Konfiguration abgelegt. Für unveränderte Konfigurationen wird
+    daher kein neuer QR-Code berechnet. Neue QR-Codes werden mit workers Prozessen berechnet, bei None mit einem
+    Prozess pro Prozessorkern. Ist output_dir angegeben, werden die Bilder zusätzlich unter dem Dateinamen der
+    Clientkonfiguration in diesem Verzeichnis abgelegt. Abschließend werden QR-Codes ohne passende Konfiguration
+    entfernt, vgl. prune_qr_cache. Gibt ein dict mit der ID des Clients und dem Dateinamen des Bildes zurück.
+    """
+
+    if image_format not in ("svg", "png"):
+        console("Unbekanntes Bildformat", image_format, mode="err", perm=True)
+        return {}
+    if image_format == "png" and importlib.util.find_spec("PIL") is None:
+        console("Für QR-Codes im Format", "png", "wird das Paket", "Pillow", "benötigt.", mode="err", perm=True)
+        return {}
+
+    if choices is None:
+        choices = range(1, len(server.clients) + 1)
+    client_ids = []
+    for choice in choices:
+        client_id = validate_client_id(server, choice)
+        # Die Konfiguration des Servers (0) wird nicht als QR-Code ausgegeben
+        if client_id is not None and client_id > 0:
+            client_ids.append(client_id)
+
+    cache_dir = WG_DIR + QR_CACHE_DIR
+    Path(cache_dir).mkdir(mode=0o700, exist_ok=True)
+
+    # Dateinamen der Bilder anhand der Konfigurationen bestimmen, nur fehlende Bilder werden erzeugt
+    filenames = {}
+    missing = {}  # Dateiname -> Konfiguration
+    for client_id in client_ids:
+        config = config_to_str(server, client_id)
+        filename = cache_dir + get_qr_code_hash(config) + "." + image_format
+        filenames[client_id] = filename
+        if not os.path.exists(filename):
+            missing[filename] = config
+
+    console(len(missing), "von", len(client_ids), "QR-Codes werden neu erzeugt.", mode="info", perm=True)
+
+    if len(missing) > 1 and (workers is None or workers > 1):
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context(PROCESS_START_METHOD)) as executor:
+            list(executor.map(render_qr_code, missing.values(), missing.keys(), repeat(image_format),
+                              chunksize=max(1, len(missing) // (4 * (workers or os.cpu_count() or 1)))))
+    else:
+        list(map(render_qr_code, missing.values(), missing.keys(), repeat(image_format)))
+
+    if output_dir is not None:
+        Path(output_dir).mkdir(mode=0o700, parents=True, exist_ok=True)
+        for client_id, filename in filenames.items():
+            name = os.path.splitext(os.path.basename(get_client_config_filename(server.clients[client_id - 1],
+                                                                                client_id)))[0]
+            target = os.path.join(output_dir, name + "." + image_format)
+            console("Lege QR-Code von Client", client_id, "unter", target, "ab.", mode="info")
+            if os.path.exists(target):
+                os.remove(target)
+            try:
+                os.link(filename, target)
+            except OSError:
+                # Das Dateisystem unterstützt keine Hardlinks
+                copy2(filename, target)
+
+    prune_qr_cache(server)
+
+    return filenames
+
+
+def get_qr_code_hash(config):
+    """
+    Gibt den SHA-256 Hashwert einer Konfiguration zurück, unter welchem ihr QR-Code zwischengespeichert wird.
+    """
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+
+def prune_qr_cache(server):
+    """
+    Entfernt alle QR-Codes im Verzeichnis WG_DIR + QR_CACHE_DIR, welche keiner aktuellen Konfiguration eines Clients
+    entsprechen, sowie Überreste abgebrochener Aufrufe. Die QR-Codes enthalten private Schlüssel und dürfen nach
+    einer Änderung nicht erhalten bleiben.
+    """
+    cache_dir = WG_DIR + QR_CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return
+
+    current = {get_qr_code_hash(client_config_to_str(server, client)) for client in server.clients}
+    removed = 0
+    with os.scandir(cache_dir) as entries:
+        for entry in entries:
+            if os.path.splitext(entry.name)[0] not in current and entry.is_file():
+                os.remove(entry.path)
+                removed += 1
+    console(removed, "nicht mehr benötigte QR-Codes entfernt.", mode="info")
+
+
+def remove_qr_codes(server, clients, output_dir=None):
+    """
+    Entfernt die zwischengespeicherten QR-Codes der aktuellen Konfigurationen von clients, vgl. generate_qr_codes,
+    sowie deren Kopien im Verzeichnis output_dir (Standard: WG_DIR + QR_OUTPUT_DIR, vgl. main). Wird vor dem Entfernen
+    eines Clients und vor dem Ändern seines Schlüsselpaares aufgerufen, damit keine QR-Codes mit nicht mehr gültigen
+    privaten Schlüsseln erhalten bleiben.
+    """
+    if output_dir is None:
+        output_dir = WG_DIR + QR_OUTPUT_DIR
+    cache_dir = WG_DIR + QR_CACHE_DIR
+
+    filenames = []
+    if os.path.isdir(cache_dir):
+        for client in clients:
+            digest = get_qr_code_hash(client_config_to_str(server, client))
+            filenames.extend(cache_dir + digest + "." + image_format for image_format in ("svg", "png"))
+    if os.path.isdir(output_dir):
+        # Die Kopien sind wie in generate_qr_codes nach der Konfigurationsdatei des Clients benannt
+        positions = {id(client): index for index, client in enumerate(server.clients, 1)}
+        for client in clients:
+            name = os.path.splitext(os.path.basename(get_client_config_filename(client, positions[id(client)])))[0]
+            filenames.extend(os.path.join(output_dir, name + "." + image_format) for image_format in ("svg", "png"))
+
+    for filename in filenames:
+        if os.path.exists(filename):
+            console("Entferne QR-Code", filename, mode="info")
+            os.remove(filename)
+
+
+def render_qr_code(config, filename, image_format):
+    """
+    Erzeugt einen QR-Code mit dem Inhalt config und speichert ihn im Format image_format unter filename. Die Datei wird
+    erst nach dem vollständigen Schreiben angelegt. Wird von generate_qr_codes ggf. in einem eigenen Prozess
+    ausgeführt.
+    """
+    if image_format == "png":
+        from qrcode.image.pil import PilImage as image_factory  # pylint: disable=import-outside-toplevel
+    else:
+        from qrcode.image.svg import SvgImage as image_factory  # pylint: disable=import-outside-toplevel
+
+    client_qr_code = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10)
+    client_qr_code.add_data(config)
+    image = client_qr_code.make_image(image_factory=image_factory)
+
+    descriptor, temporary_filename = mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(filename))
+    try:
+        with open(descriptor, "wb") as image_file:
+            image.save(image_file)
+        os.replace(temporary_filename, filename)
+    except BaseException:
+        os.remove(temporary_filename)
+        raise
+
+
 def validate_client_id(server, choice):
     """
     Prüft, ob der übergebene Parameter ein Ganzzahl-Objekt ist und ein Client mit dieser ID existiert.
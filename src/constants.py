@@ -34,12 +34,97 @@ RE_MATCH_KEY = r"^ *([a-zA-Z]*) *"
 # zweite Gruppe beinhaltet den Wert ohne führende Leerzeichen.
 RE_MATCH_KEY_VALUE = r"^([^ ]*) *= *(.*)"
 
-# Relativer Ordnerpfad zu WG_DIR für die Datensicherung. Muss mit einem / enden.
+# Regulärer Ausdruck für die Klassifizierung einer Zeile einer Konfigurationsdatei in einem Durchlauf. Die Zeile wird
+# ohne Zeilenumbruch übergeben. Die zuletzt gefüllte Gruppe (Match.lastgroup) gibt die Art der Zeile an: blank (leer
+# oder nur Leerzeichen), section (INI-Sektion), comment (Kommentar) oder value (Name-Wert Paar wie in
+# RE_MATCH_KEY_VALUE, Gruppen key und value).
+RE_MATCH_CONFIG_LINE = r"(?P<blank> *$)|(?P<section>\[.*]$)|(?P<comment>#)|(?P<key>[^ ]*) *= *(?P<value>.*)"
+
+# Anzahl der Prozesse für den Import der Clientkonfigurationen. 1 importiert seriell im Hauptprozess, None verwendet
+# einen Prozess pro Prozessorkern. Lohnt sich erst bei einer großen Anzahl von Clients.
+IMPORT_WORKERS = 1
+
+# Peer-Sektionen der Serverkonfiguration beim Import nicht vollständig einlesen, sondern über einen Index der Datei
+# (vgl. peer_index.PeerIndex) nur bei Bedarf. Für Serverkonfigurationen mit sehr vielen Peer-Sektionen.
+LAZY_PEER_INDEX = False
+
+# Von den Clientkonfigurationen beim Import nur Bezeichnung, Address und PrivateKey einlesen. Alle übrigen Parameter
+# werden beim ersten Zugriff eingelesen (vgl. client_config.LazyClientConfig).
+LAZY_CLIENT_CONFIG = False
+
+# Minimaler Abstand zwischen zwei Ausgaben der Fortschrittsanzeige bei Import und Export in Sekunden. Vorgänge, die
+# kürzer dauern, erzeugen keine Ausgaben.
+PROGRESS_INTERVAL = 1.0
+
+# Relativer Ordnerpfad zu WG_DIR für die Datensicherung. Enthält pro Export ein Unterverzeichnis mit dem Zeitpunkt
+# als Bezeichnung (Generation). Muss mit einem / enden.
 SAVEDIR = ".wg_conf_bak/"
 
-# Relativer Ordnerpfad zu WG_DIR für die Datensicherung. Wird nach erfolgreicher Erstellung in SAVEDIR umbenannt,
-# um Datenverlust bei einem Fehler im Export vorzubeugen. Muss mit einem / enden.
+# Relativer Ordnerpfad zu WG_DIR für die Datensicherung. Wird nach erfolgreicher Erstellung als neue Generation in
+# SAVEDIR verschoben, um Datenverlust bei einem Fehler im Export vorzubeugen. Muss mit einem / enden.
 SAVEDIR_NEW = ".wg_conf_bak_new/"
 
+# Anzahl der aufbewahrten Generationen in SAVEDIR. Ältere Generationen werden beim Export entfernt.
+BACKUP_GENERATIONS = 10
+
+# Dateiname innerhalb einer Generation mit den Namen der Dateien, welche der anschließende Export schreibt oder
+# entfernt. Die folgende Generation übernimmt alle übrigen Dateien als Hardlinks aus dieser Generation.
+BACKUP_CHANGES_FILENAME = ".changes"
+
 # Datensicherung beim Export deaktivieren
 DISABLE_BACKUP = False
+
+# Konfigurationen beim Export zunächst in temporäre Dateien in WG_DIR schreiben und diese anschließend mit os.replace
+# an die Stelle der bisherigen Dateien setzen. Bei einem Abbruch bleibt jede Datei entweder vollständig alt oder
+# vollständig neu.
+ATOMIC_EXPORT = True
+
+# Anzahl der temporären Dateien, welche beim atomaren Export gemeinsam geschrieben, mit fsync auf den Datenträger
+# geschrieben und anschließend ersetzt werden. Begrenzt die Anzahl gleichzeitig geöffneter Dateien.
+FSYNC_BATCH_SIZE = 64
+
+# Anzahl der Threads für das Schreiben der Dateien beim Export. 1 schreibt seriell, None verwendet die Standardanzahl
+# von ThreadPoolExecutor. Lohnt sich bei Dateisystemen mit hoher Latenz pro Datei, z.B. NFS oder overlayfs.
+EXPORT_WORKERS = 1
+
+# Berechtigungen der Konfigurationen beim Export in ein Archiv, vgl. exporting.export_archive. Die Konfigurationen
+# enthalten private Schlüssel und sind daher nur für den Besitzer lesbar.
+ARCHIVE_MODE = 0o600
+
+# Größe in Bytes, ab welcher eine Konfiguration beim Export in ein tar-Archiv nicht mehr im Arbeitsspeicher, sondern in
+# einer temporären Datei zwischengespeichert wird.
+ARCHIVE_SPOOL_SIZE = 1024 * 1024
+
+# Anzahl der Peers, welche beim Export der Änderungen der Peers in einem Aufruf von wg set zusammengefasst werden, vgl.
+# exporting.export_peer_delta.
+PEER_DELTA_BATCH_SIZE = 100
+
+# Relativer Ordnerpfad zu WG_DIR für QR-Codes im Bildformat. Die Dateinamen entsprechen dem Hashwert der Konfiguration,
+# vgl. config_management.generate_qr_codes. Muss mit einem / enden.
+QR_CACHE_DIR = ".wg_qr_cache/"
+
+# Anzahl der Prozesse für die Erzeugung von QR-Codes im Bildformat. 1 erzeugt seriell im Hauptprozess, None verwendet
+# einen Prozess pro Prozessorkern.
+QR_WORKERS = None
+
+# Relativer Ordnerpfad zu WG_DIR, in welchem die QR-Codes aller Clients aus dem Hauptmenü unter dem Dateinamen der
+# jeweiligen Clientkonfiguration abgelegt werden. Muss mit einem / enden.
+QR_OUTPUT_DIR = ".wg_qr/"
+
+# Anzahl der im Hintergrund vorab erzeugten Schlüsselpaare für neue Clients und neue Schlüsselpaare. 0 erzeugt jedes
+# Schlüsselpaar erst bei Bedarf, vgl. keys.KeyPool.
+KEY_POOL_SIZE = 64
+
+# Anzahl der Prozesse für das Erneuern der Schlüsselpaare vieler Clients, vgl. config_management.rotate_client_keypairs.
+# 1 erzeugt seriell im Hauptprozess, None verwendet einen Prozess pro Prozessorkern.
+KEY_ROTATION_WORKERS = None
+
+# Startmethode der Prozesse für ProcessPoolExecutor (vgl. multiprocessing.get_context). Mit "fork" können Kindprozesse
+# Sperren erben, welche ein anderer Thread gerade hält (z.B. keys.KeyPool während der Erzeugung eines Schlüssels), und
+# dadurch dauerhaft blockieren. "spawn" startet neue Interpreter und ist auch unter Windows verfügbar.
+PROCESS_START_METHOD = "spawn"
+
+# Gibt an, ob change_network_size gültige IP-Adressen beibehält. Verwendet wird dann das Netzwerk der neuen Größe,
+# welches die bisherige Adresse des Servers enthält, sofern es privat ist. Neu vergeben werden nur Adressen außerhalb
+# des Netzwerks oder mit Konflikten. Bei False erhalten alle Clients aufsteigende Adressen ab dem Anfang des Netzwerks.
+KEEP_ADDRESSES_ON_RESIZE = True
@@ -6,84 +6,693 @@ Enthält alle Funktionen für das Exportieren von Konfigurationen aus dem Arbeit
 # pylint: disable=import-error
 
 # Imports aus Standardbibliotheken
+from contextlib import ExitStack
+from contextlib import redirect_stdout  # Für Ausgaben beim Schreiben eines Archivs in die Standardausgabe
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from datetime import datetime  # Für die Bezeichnung der Generationen der Datensicherung
+from functools import partial
+import io
+from operator import attrgetter  # Für die Tabellen der Parameter der Sektionen
 import os
 from pathlib import Path
+import shlex  # Für die Ausgabe von wg set Befehlen
+import stat  # Für die Übernahme der Berechtigungen beim atomaren Export
+import sys
+import tarfile  # Für den Export in ein Archiv
+from tempfile import mkstemp  # Für temporäre Dateien beim atomaren Export
+from tempfile import SpooledTemporaryFile
+import time
+import zipfile  # Für den Export in ein Archiv
 
 # Imports von Drittanbietern
+from shutil import copy2
 from shutil import rmtree
 
 # Eigene Imports
+from constants import ARCHIVE_MODE
+from constants import ARCHIVE_SPOOL_SIZE
+from constants import ATOMIC_EXPORT
+from constants import BACKUP_CHANGES_FILENAME
+from constants import BACKUP_GENERATIONS
+from constants import DEBUG
 from constants import DISABLE_BACKUP
+from constants import EXPORT_WORKERS
+from constants import FSYNC_BATCH_SIZE
 from constants import INTERFACE_CONFIG_PARAMETERS
 from constants import PEER_CONFIG_PARAMETERS
+from constants import PEER_DELTA_BATCH_SIZE
 from constants import SAVEDIR
 from constants import SAVEDIR_NEW
 from constants import SERVER_CONFIG_FILENAME
 from constants import WG_DIR
+from client_config import LazyClientConfig
 from debugging import console
+from peer_index import PeerIndex
+from progress import Progress
 
+# Tabellen für die Ausgabe der Sektionen, einmalig beim Laden des Moduls erstellt. Enthalten pro Parameter den Namen in
+# CamelCase und eine Funktion, welche den Wert aus einem Server- oder Client-Objekt liest.
+# Interface-Sektion von Server und Clients
+INTERFACE_ACCESSORS = tuple((parameter, attrgetter(parameter.lower())) for parameter in INTERFACE_CONFIG_PARAMETERS)
+# Peer-Sektion in einer Clientkonfiguration, die Werte sind im Client-Objekt hinterlegt
+PEER_ACCESSORS = tuple((parameter, attrgetter(parameter.lower())) for parameter in PEER_CONFIG_PARAMETERS)
+# Peer-Sektion eines Clients in der Serverkonfiguration, die Werte sind mit dem Präfix client_ hinterlegt
+SERVER_PEER_ACCESSORS = tuple((parameter, attrgetter("client_" + parameter.lower()))
+                              for parameter in PEER_CONFIG_PARAMETERS)
 
-def export_configurations(server):
+
+def export_configurations(server, full=False, atomic=ATOMIC_EXPORT, workers=EXPORT_WORKERS):
     """
-    Exportiert die Konfigurationen aus dem Arbeitsspeicher in das Wireguard-Verzeichnis.
+    Exportiert die Konfigurationen aus dem Arbeitsspeicher in das Wireguard-Verzeichnis. Geschrieben werden nur die seit
+    dem letzten Import oder Export veränderten Konfigurationen (vgl. Attribut dirty), mit full=True alle. Bevor
+    Dateien überschrieben oder entfernt werden, wird eine neue Generation der Datensicherung angelegt (vgl.
+    backup_configurations). Mit atomic werden die Dateien über temporäre Dateien ersetzt, vgl. write_files_atomic.
+    workers gibt die Anzahl der Threads für das Schreiben an. Bei 1 erfolgt der Export seriell, vgl.
+    write_files_parallel. Nicht geschriebene Konfigurationen bleiben als verändert markiert.
     """
 
-    # Prüfung, ob Konfigurationen vorhanden sind
-    files = os.listdir(WG_DIR)
+    # Zu schreibende Dateien mit der Angabe, welche Konfiguration enthalten ist. 0 steht für den Server.
+    changed_files = {}
+    if full or server.dirty:
+        changed_files[WG_DIR + SERVER_CONFIG_FILENAME] = 0
 
-    # Entfernung des Ordners einer vorherigen Datensicherung aus der Liste, falls vorhanden
-    if SAVEDIR.strip("/") in files:
-        console("Vorherige Datensicherung erkannt", mode="info")
-        files.remove(SAVEDIR.strip("/"))
+    index = 0
+    for client in server.clients:
+        index = index + 1
+        # Neue Clients erhalten einen Dateinamen, dieser bleibt bei späteren Exporten unverändert
+        if client.filename == "":
+            client.filename = get_client_config_filename(client, index)
+        if full or client.dirty:
+            changed_files[client.filename] = index
+
+    # Vorhandene Dateien, welche überschrieben oder entfernt werden
+    files = [file for file in dict.fromkeys(list(changed_files) + server.removed_filenames) if Path(file).exists()]
+
+    if len(changed_files) == 0 and len(files) == 0:
+        console("Keine Änderungen seit dem letzten Import oder Export.", mode="info", perm=True)
+        return
+
+    console("Zu schreibende Dateien:", len(changed_files), "davon bereits vorhanden:", len(files), mode="info")
+
+    # Nicht vollständig eingelesene Clients (vgl. LazyClientConfig) lesen ihre Datei beim ersten Zugriff. Dies muss
+    # geschehen, bevor Dateien entfernt oder überschrieben werden. Die Serverkonfiguration umfasst alle Clients.
+    if 0 in changed_files.values():
+        rendered_clients = server.clients
+    else:
+        rendered_clients = [server.clients[choice - 1] for choice in changed_files.values()]
+    try:
+        for client in rendered_clients:
+            if isinstance(client, LazyClientConfig) and client.rest_offset is not None:
+                client.load()
+    except OSError:
+        console("Konfiguration", client.filename, "konnte nicht vollständig eingelesen werden. Breche ab.", mode="err",
+                perm=True)
+        return
+
+    # Fortschrittsanzeige für die Clientkonfigurationen
+    progress = Progress("Export", len(changed_files) - (0 in changed_files.values()))
+
+    with progress.phase("Datensicherung"):
+        # Beim atomaren Export werden nur die Dateien entfernter oder umbenannter Clients entfernt
+        removed_files = [file for file in files if file not in changed_files] if atomic else files
+
+        if not DISABLE_BACKUP:
+            changes = list(changed_files) + server.removed_filenames
+            if len(files) > 0:
+                # Alte Konfigurationen sichern. Zu entfernende Dateien werden direkt in die Datensicherung verschoben.
+                backup_configurations(files, changes, removed_files)
+            else:
+                # Es werden nur neue Dateien geschrieben, diese werden in der letzten Generation vermerkt
+                record_backup_changes(changes)
+        files = removed_files
+
+        # Dateien entfernen, falls diese noch existieren. Die Konfigurationen werden dadurch immer in neue Dateien
+        # geschrieben und nicht überschrieben (vgl. PeerIndex).
+        for file in files:
+            if Path(file).exists():
+                console("Entferne Datei", file, mode="info")
+                os.remove(file)
+
+    failed_files = set()
+    if workers is None or workers > 1:
+        with progress.phase("Schreiben"):
+            failed_files = write_files_parallel([(filename, partial(write_config, server, choice, cache=False),
+                                                  choice != 0) for filename, choice in changed_files.items()],
+                                                workers, atomic, progress)
+    elif atomic:
+        with progress.phase("Schreiben"):
+            failed_files = write_files_atomic(((filename, partial(write_config, server, choice, cache=False),
+                                                choice != 0) for filename, choice in changed_files.items()), progress)
+    else:
+        for filename, choice in changed_files.items():
+            try:
+                if choice == 0:
+                    # Serverkonfiguration schreiben
+                    with progress.phase("Server"), open(filename, "w", encoding='utf-8') as server_config_file:
+                        console("Schreibe Serverkonfiguration", filename, mode="info")
+                        write_config(server, 0, server_config_file, cache=False)
+                else:
+                    # Clientkonfiguration schreiben
+                    with progress.phase("Clients"), open(filename, "w", encoding='utf-8') as client_config_file:
+                        console("Schreibe Konfiguration für Client", choice, "in", filename, mode="info")
+                        write_config(server, choice, client_config_file, cache=False)
+            except OSError as exception:
+                _add_failed_file(failed_files, filename, exception)
+            if choice != 0:
+                progress.advance()
+        _report_failed_files(failed_files)
+
+    # Alle geschriebenen Konfigurationen entsprechen nun den Dateien
+    server.dirty = WG_DIR + SERVER_CONFIG_FILENAME in failed_files
+    server.removed_filenames.clear()
+    for client in server.clients:
+        client.dirty = client.filename in failed_files
 
-    console("Enthaltene Dateien in ", WG_DIR, ": ", str(files), mode="info", no_space=True)
+    progress.finish()
 
-    if files != [''] and not DISABLE_BACKUP:
-        # Falls ja: alte Konfigurationen sichern
-        # Wenn nicht bereits vorhanden, das Sicherungsverzeichnis anlegen
-        console("Erstelle Ordner", WG_DIR + SAVEDIR_NEW, mode="info")
-        Path(WG_DIR + SAVEDIR_NEW).mkdir(parents=True, exist_ok=True)
 
-        # Dateien in das Verzeichnis verschieben
-        for file in files:
-            console("Verschiebe Datei", WG_DIR + file, "in", WG_DIR + SAVEDIR_NEW, mode="info")
-            os.rename(WG_DIR + file, WG_DIR + SAVEDIR_NEW + file)
-
-        # Sicherungsverzeichnis umbenennen, alte Datensicherung überschreiben
-        console("Ordner", WG_DIR + SAVEDIR_NEW, "wird umbenannt in", WG_DIR + SAVEDIR, mode="info")
-        # Wenn SAVEDIR Dateien enthält, kann os.replace diesen nicht entfernen
-        rmtree(WG_DIR + SAVEDIR, ignore_errors=True)
-        os.replace(Path(WG_DIR + SAVEDIR_NEW), Path(WG_DIR + SAVEDIR))  # os.replace funktioniert unter Unix und Windows
-
-    # Verzeichnis leeren, falls Dateien noch existieren
-    for file in files:
-        if Path(file).exists():
-            console("Entferne Datei", file, mode="info")
-            os.remove(WG_DIR + file)
-
-    # Serverkonfiguration schreiben
-    with open(WG_DIR + SERVER_CONFIG_FILENAME, "w", encoding='utf-8') as server_config_file:
-        console("Schreibe Serverkonfiguration", WG_DIR + SERVER_CONFIG_FILENAME, mode="info")
-        server_config_file.write(config_to_str(server, 0))
-        server_config_file.close()
-
-    # Clientkonfigurationen schreiben
+def get_client_config_filename(client, index):
+    """
+    Gibt den Dateinamen der Konfiguration des Clients an Position index (beginnend mit 1) zurück. Ist im Client kein
+    Dateiname hinterlegt, wird dieser aus der Bezeichnung oder der Position gebildet.
+    """
+    if client.filename != "":
+        return client.filename
+    if client.name != "":
+        return WG_DIR + f"{client.name}".replace(" ", "_") + ".conf"
+    return f"{WG_DIR}Client_{index}.conf"
+
+
+def export_archive(server, target="-", archive_format=None, mtime=None):
+    """
+    Exportiert die Serverkonfiguration und alle Clientkonfigurationen in ein einzelnes Archiv, ohne Dateien in WG_DIR
+    anzulegen. target ist ein Dateiname, ein binärer Datenstrom oder "-" für die Standardausgabe. archive_format ist
+    "tar", "tar.gz" oder "zip", ohne Angabe wird es anhand der Dateiendung von target bestimmt (Standard: tar). Die
+    Konfigurationen werden nacheinander in das Archiv geschrieben, welches dabei nie zurückgesetzt wird. Daher eignen
+    sich auch Pipes. Alle Einträge erhalten die Berechtigungen ARCHIVE_MODE und denselben Zeitstempel mtime (Standard:
+    Zeitpunkt des Aufrufs). Die Dateinamen entsprechen denen aus export_configurations ohne Verzeichnis.
+    """
+
+    if mtime is None:
+        mtime = int(time.time())
+
+    if archive_format is None:
+        name = target if isinstance(target, str) else ""
+        if name.endswith(".zip"):
+            archive_format = "zip"
+        elif name.endswith((".tar.gz", ".tgz")):
+            archive_format = "tar.gz"
+        else:
+            archive_format = "tar"
+    if archive_format not in ("tar", "tar.gz", "zip"):
+        console("Unbekanntes Archivformat", archive_format, mode="err", perm=True)
+        return
+
+    # Einträge des Archivs mit einer Funktion, welche den Inhalt in einen übergebenen Textstrom schreibt
+    members = [(SERVER_CONFIG_FILENAME, partial(write_config, server, 0, cache=False))]
     index = 0
     for client in server.clients:
         index = index + 1
-        if client.filename != "":
-            client_config_filename = client.filename
-            console("Schreibe Konfiguration für Client", index, "in", WG_DIR + client_config_filename, mode="info")
-        elif client.name != "":
-            client_config_filename = WG_DIR + f"{client.name}".replace(" ", "_") + ".conf"
-            console("Schreibe Konfiguration für Client", index, "in", WG_DIR + client_config_filename, mode="info")
+        members.append((os.path.basename(get_client_config_filename(client, index)),
+                        partial(write_config, server, index, cache=False)))
+
+    with ExitStack() as stack:
+        if target == "-":
+            # Ausgaben auf der Konsole werden auf die Standardfehlerausgabe umgeleitet, damit das Archiv in der
+            # Standardausgabe nicht beschädigt wird
+            sys.stdout.flush()
+            stream = sys.stdout.buffer
+            stack.enter_context(redirect_stdout(sys.stderr))
+        elif isinstance(target, str):
+            stream = stack.enter_context(open(target, "wb"))
+        else:
+            stream = target
+
+        console("Schreibe", len(members), "Konfigurationen in ein Archiv im Format", archive_format, mode="info")
+        if archive_format == "zip":
+            _write_zip(stream, members, mtime)
+        else:
+            _write_tar(stream, members, mtime, archive_format == "tar.gz")
+        stream.flush()
+
+
+def _write_tar(stream, members, mtime, compress):
+    """
+    Schreibt members als tar-Archiv in den binären Datenstrom stream, vgl. export_archive. Die Größe eines Eintrags
+    muss vor dessen Inhalt feststehen. Daher wird jeder Inhalt zunächst in eine temporäre Datei geschrieben, welche
+    erst ab ARCHIVE_SPOOL_SIZE Bytes auf dem Datenträger angelegt wird.
+    """
+    with tarfile.open(fileobj=stream, mode="w|gz" if compress else "w|", format=tarfile.PAX_FORMAT) as archive:
+        for name, writer in members:
+            with SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_SIZE) as content:
+                text = io.TextIOWrapper(content, encoding='utf-8')
+                writer(text)
+                text.flush()
+                text.detach()
+
+                info = tarfile.TarInfo(name)
+                info.size = content.tell()
+                info.mode = ARCHIVE_MODE
+                info.mtime = mtime
+                info.uname = info.gname = "root"
+                content.seek(0)
+                archive.addfile(info, content)
+
+
+def _write_zip(stream, members, mtime):
+    """
+    Schreibt members als zip-Archiv in den binären Datenstrom stream, vgl. export_archive. Der Inhalt wird direkt
+    komprimiert in das Archiv geschrieben.
+    """
+    date_time = time.gmtime(max(mtime, 315532800))[:6]  # zip unterstützt keine Zeitstempel vor 1980
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, writer in members:
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = (stat.S_IFREG | ARCHIVE_MODE) << 16
+            with archive.open(info, "w", force_zip64=True) as content, \
+                    io.TextIOWrapper(content, encoding='utf-8') as text:
+                writer(text)
+
+
+def compute_peer_delta(server, filename=None):
+    """
+    Vergleicht die Peer-Sektionen der Serverkonfiguration im Arbeitsspeicher mit denen der Serverkonfiguration in der
+    Datei filename (Standard: WG_DIR + SERVER_CONFIG_FILENAME). Gibt ein Tupel aus drei Listen zurück: hinzugefügte
+    Clients, öffentliche Schlüssel entfernter Peers und Tupel aus geändertem Client und dem Peer-Objekt aus der Datei.
+    Die Peers werden über den öffentlichen Schlüssel zugeordnet, verglichen werden AllowedIPs, Endpoint und
+    PersistentKeepalive.
+    """
+
+    if filename is None:
+        filename = WG_DIR + SERVER_CONFIG_FILENAME
+
+    added = []
+    changed = []
+    with PeerIndex(filename) as peer_sections:
+        publickeys = set()
+        for client in server.clients:
+            publickey = str(client.client_publickey)
+            if publickey == "":
+                console("Client", client.name, "hat keinen öffentlichen Schlüssel und wird übersprungen.", mode="warn",
+                        perm=True)
+                continue
+            publickeys.add(publickey)
+
+            peer = peer_sections.get(publickey)
+            if peer is None:
+                added.append(client)
+            elif any(_normalize_peer_value(getattr(peer, parameter)) !=
+                     _normalize_peer_value(getattr(client, "client_" + parameter))
+                     for parameter in ("allowedips", "endpoint", "persistentkeepalive")):
+                changed.append((client, peer))
+
+        removed = [publickey for publickey in peer_sections if publickey not in publickeys]
+
+    return added, removed, changed
+
+
+def export_peer_delta(server, target="-", filename=None):
+    """
+    Schreibt ein Shell-Skript, welches die Änderungen der Peers gegenüber der Serverkonfiguration in der Datei filename
+    (vgl. compute_peer_delta) mit wg set auf die laufende Schnittstelle anwendet. Die Schnittstelle muss dafür nicht
+    neu gestartet werden, Verbindungen unveränderter Peers bleiben bestehen. Je PEER_DELTA_BATCH_SIZE Peers werden in
+    einem Aufruf von wg set zusammengefasst. target ist ein Dateiname, ein Textstrom oder "-" für die Standardausgabe.
+    Muss vor export_configurations aufgerufen werden, da dabei die Serverkonfiguration ersetzt wird.
+    """
+
+    if filename is None:
+        filename = WG_DIR + SERVER_CONFIG_FILENAME
+    interface = os.path.splitext(os.path.basename(filename))[0]
+
+    try:
+        added, removed, changed = compute_peer_delta(server, filename)
+    except OSError:
+        console("Serverkonfiguration", filename, "konnte nicht gelesen werden.", mode="err", perm=True)
+        return
+
+    # Argumente von wg set pro Peer
+    arguments = [["peer", publickey, "remove"] for publickey in removed]
+    for client, peer in changed:
+        # Ein Endpoint kann mit wg set nicht entfernt werden. Der Peer wird in diesem Fall neu angelegt.
+        if peer.endpoint.strip() != "" and str(client.client_endpoint).strip() == "":
+            arguments.append(["peer", str(client.client_publickey), "remove"])
+            arguments.append(_peer_arguments(client))
+        else:
+            arguments.append(_peer_arguments(client, reset=True))
+    arguments.extend(_peer_arguments(client) for client in added)
+
+    with ExitStack() as stack:
+        if target == "-":
+            # Ausgaben auf der Konsole werden auf die Standardfehlerausgabe umgeleitet, vgl. export_archive
+            stream = sys.stdout
+            stack.enter_context(redirect_stdout(sys.stderr))
+        elif isinstance(target, str):
+            stream = stack.enter_context(open(target, "w", encoding='utf-8'))
+        else:
+            stream = target
+
+        console(len(added), "Peers hinzugefügt,", len(removed), "entfernt,", len(changed), "geändert.", mode="info",
+                perm=True)
+
+        stream.write("#!/bin/sh\n")
+        stream.write(f"# Änderungen der Peers von {interface} gegenüber {filename}: {len(added)} hinzugefügt, "
+                     f"{len(removed)} entfernt, {len(changed)} geändert\n")
+        stream.write("set -e\n")
+        for start in range(0, len(arguments), PEER_DELTA_BATCH_SIZE):
+            stream.write(f"wg set {shlex.quote(interface)}")
+            for peer_arguments in arguments[start:start + PEER_DELTA_BATCH_SIZE]:
+                stream.write(" \\\n    " + " ".join(shlex.quote(argument) for argument in peer_arguments))
+            stream.write("\n")
+
+
+def _peer_arguments(client, reset=False):
+    """
+    Gibt die Argumente von wg set für die Peer-Sektion eines Clients zurück. Mit reset werden leere Werte von AllowedIPs
+    und PersistentKeepalive explizit zurückgesetzt.
+    """
+    peer_arguments = ["peer", str(client.client_publickey)]
+    allowedips = _normalize_peer_value(client.client_allowedips)
+    if allowedips != "" or reset:
+        peer_arguments.extend(["allowed-ips", allowedips])
+    if str(client.client_endpoint).strip() != "":
+        peer_arguments.extend(["endpoint", str(client.client_endpoint).strip()])
+    if str(client.client_persistentkeepalive).strip() != "":
+        peer_arguments.extend(["persistent-keepalive", str(client.client_persistentkeepalive).strip()])
+    elif reset:
+        peer_arguments.extend(["persistent-keepalive", "off"])
+    return peer_arguments
+
+
+def _normalize_peer_value(value):
+    """
+    Gibt einen Wert der Peer-Sektion für den Vergleich zurück. Listen wie AllowedIPs werden ohne Leerzeichen
+    zusammengefügt.
+    """
+    return ",".join(part.strip() for part in str(value).split(",") if part.strip() != "")
+
+
+def backup_configurations(files, changes, move=()):
+    """
+    Legt vor einem Export eine neue Generation der Datensicherung im Verzeichnis WG_DIR + SAVEDIR + Zeitpunkt an und
+    entfernt Generationen über BACKUP_GENERATIONS hinaus. Jede Generation enthält den Stand aller Dateien in WG_DIR vor
+    dem jeweiligen Export. files sind die vorhandenen Dateien, welche der Export überschreibt oder entfernt. Diese
+    werden aus WG_DIR kopiert, bzw. verschoben, falls sie in move enthalten sind und ohnehin entfernt werden. changes
+    sind alle Dateien, welche der Export schreibt oder entfernt. Sie werden in der Generation vermerkt (vgl.
+    BACKUP_CHANGES_FILENAME). Alle übrigen Dateien werden als Hardlinks auf die Kopien der vorherigen Generation
+    angelegt, sofern Größe und Zeitpunkt der letzten Änderung mit der Datei in WG_DIR übereinstimmen. Dateien in
+    WG_DIR werden nie verlinkt. Manuell veränderte oder hinzugefügte Dateien sowie die vom vorherigen Export
+    geschriebenen Dateien werden aus WG_DIR kopiert. Kopiert werden damit nur geänderte Dateien, für alle übrigen
+    genügt ein Vergleich der Dateimerkmale. Ohne verwertbare vorherige Generation werden einmalig alle Dateien kopiert.
+    """
+
+    backup_dir = WG_DIR + SAVEDIR_NEW
+    wg_dir = os.path.dirname(WG_DIR)
+    # Gesichert werden wie beim Import nur reguläre Dateien
+    names = {os.path.basename(file) for file in files if os.path.dirname(file) == wg_dir and Path(file).is_file()}
+    move_names = {os.path.basename(file) for file in move if os.path.dirname(file) == wg_dir}
+
+    # Überreste eines abgebrochenen Exports entfernen und das Verzeichnis für die neue Generation anlegen
+    rmtree(backup_dir, ignore_errors=True)
+    console("Erstelle Ordner", backup_dir, mode="info")
+    Path(backup_dir).mkdir(parents=True)
+
+    # Vorherige Generation und die darin vermerkten Änderungen des vorherigen Exports
+    Path(WG_DIR + SAVEDIR).mkdir(exist_ok=True)
+    generations = sorted(entry.name for entry in os.scandir(WG_DIR + SAVEDIR) if entry.is_dir())
+    previous_changes = None
+    linked_names = set()
+    if len(generations) > 0:
+        previous_dir = WG_DIR + SAVEDIR + generations[-1] + "/"
+        try:
+            with open(previous_dir + BACKUP_CHANGES_FILENAME, encoding='utf-8') as changes_file:
+                previous_changes = set(changes_file.read().splitlines())
+        except FileNotFoundError:
+            # Generation einer älteren Version ohne vermerkte Änderungen
+            previous_changes = None
+
+    # Aktueller Stand in WG_DIR. Größe und Zeitpunkt der letzten Änderung bleiben beim Kopieren mit copy2 erhalten.
+    with os.scandir(WG_DIR) as entries:
+        live_files = {entry.name: entry.stat() for entry in entries
+                      if not entry.name.startswith(".") and entry.is_file()}
+
+    if previous_changes is not None:
+        with os.scandir(previous_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or entry.name in names:
+                    continue
+                if entry.name in previous_changes:
+                    # Vom vorherigen Export geschrieben bzw. entfernt, der aktuelle Stand liegt in WG_DIR
+                    continue
+                live_stat = live_files.get(entry.name)
+                if live_stat is None:
+                    # Seit der vorherigen Generation aus WG_DIR entfernt
+                    continue
+                stat = entry.stat()
+                if (stat.st_size, stat.st_mtime_ns) != (live_stat.st_size, live_stat.st_mtime_ns):
+                    # Seit der vorherigen Generation verändert, z.B. manuell
+                    continue
+                try:
+                    os.link(entry.path, backup_dir + entry.name)
+                except OSError:
+                    # Das Dateisystem unterstützt keine Hardlinks
+                    copy2(entry.path, backup_dir + entry.name)
+                linked_names.add(entry.name)
+
+    # Alle nicht verlinkten Dateien aus WG_DIR sichern. Ohne verwertbare vorherige Generation sind dies alle Dateien.
+    names.update(live_files.keys() - linked_names)
+
+    for name in names:
+        if name in move_names:
+            console("Verschiebe Datei", WG_DIR + name, "nach", backup_dir, mode="info")
+            os.replace(WG_DIR + name, backup_dir + name)
         else:
-            client_config_filename = f"{WG_DIR}Client_{index}.conf"
-            console("Schreibe Konfiguration für Client", index, "in", WG_DIR + client_config_filename, mode="info")
+            console("Sichere Datei", WG_DIR + name, "in", backup_dir, mode="info")
+            copy2(WG_DIR + name, backup_dir + name)
+
+    with open(backup_dir + BACKUP_CHANGES_FILENAME, "w", encoding='utf-8') as changes_file:
+        changes_file.writelines(os.path.basename(file) + "\n" for file in changes if os.path.dirname(file) == wg_dir)
+
+    # Neue Generation unter dem aktuellen Zeitpunkt hinterlegen. Die Bezeichnungen sind chronologisch sortierbar.
+    generation = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+    console("Ordner", backup_dir, "wird umbenannt in", WG_DIR + SAVEDIR + generation, mode="info")
+    # os.replace funktioniert unter Unix und Windows
+    os.replace(Path(backup_dir), Path(WG_DIR + SAVEDIR + generation))
+
+    # Alte Generationen entfernen. Dateien direkt in SAVEDIR (Datensicherung älterer Versionen) bleiben erhalten.
+    generations.append(generation)
+    for old_generation in generations[:-BACKUP_GENERATIONS]:
+        console("Entferne Datensicherung", WG_DIR + SAVEDIR + old_generation, mode="info")
+        rmtree(WG_DIR + SAVEDIR + old_generation, ignore_errors=True)
 
-        with open(client_config_filename, "w", encoding='utf-8') as client_config_file:
-            client_config_file.write(config_to_str(server, index))
-            client_config_file.close()
+
+def record_backup_changes(changes):
+    """
+    Vermerkt die Dateien in changes zusätzlich in der letzten Generation der Datensicherung, ohne eine neue Generation
+    anzulegen, vgl. backup_configurations. Für Exporte, welche keine vorhandenen Dateien überschreiben.
+    """
+    if not Path(WG_DIR + SAVEDIR).is_dir():
+        return
+    generations = sorted(entry.name for entry in os.scandir(WG_DIR + SAVEDIR) if entry.is_dir())
+    if len(generations) == 0:
+        return
+    changes_filename = WG_DIR + SAVEDIR + generations[-1] + "/" + BACKUP_CHANGES_FILENAME
+    if not Path(changes_filename).exists():
+        # Ohne Vermerk werden bei der nächsten Generation ohnehin alle Dateien gesichert
+        return
+    wg_dir = os.path.dirname(WG_DIR)
+    with open(changes_filename, "a", encoding='utf-8') as changes_file:
+        changes_file.writelines(os.path.basename(file) + "\n" for file in changes if os.path.dirname(file) == wg_dir)
+
+
+def write_files_atomic(contents, progress=None):
+    """
+    Schreibt Dateien atomar. contents liefert Tupel aus Dateiname, einer Funktion, welche den Inhalt in einen
+    übergebenen Textstrom schreibt, und der Angabe, ob progress.advance() aufgerufen werden soll. Jeder Inhalt wird
+    zunächst in eine temporäre Datei im selben Verzeichnis geschrieben. Je FSYNC_BATCH_SIZE Dateien werden gemeinsam
+    mit fsync auf den Datenträger geschrieben und anschließend mit os.replace an die Stelle der Zieldatei gesetzt. Zum
+    Abschluss wird einmalig das Verzeichnis mit fsync gesichert. Bei einem Abbruch ist jede Zieldatei entweder
+    unverändert oder vollständig ersetzt. Die Berechtigungen einer vorhandenen Zieldatei werden übernommen, neue
+    Dateien sind nur für den Besitzer lesbar. Fehler werden wie in write_files_parallel pro Datei ausgegeben und brechen
+    das Schreiben nicht ab. Gibt die Menge der nicht geschriebenen Dateien zurück.
+    """
+
+    batch = []  # Tupel aus Dateideskriptor, temporärem Dateinamen und Zieldateiname
+    directories = set()
+    failed_files = set()
+
+    try:
+        for filename, writer, advance in contents:
+            try:
+                batch.append(_write_temporary_file(filename, writer))
+                directories.add(os.path.dirname(filename) or ".")
+            except OSError as exception:
+                _add_failed_file(failed_files, filename, exception)
+
+            if len(batch) >= FSYNC_BATCH_SIZE:
+                _commit_batch(batch, failed_files)
+            if advance and progress is not None:
+                progress.advance()
+
+        _commit_batch(batch, failed_files)
+    finally:
+        # Bei einem Abbruch verbleibende temporäre Dateien entfernen
+        for descriptor, temporary_filename, _ in batch:
+            os.close(descriptor)
+            os.remove(temporary_filename)
+
+    fsync_directories(directories)
+    _report_failed_files(failed_files)
+
+    return failed_files
+
+
+def write_file(filename, writer, atomic=ATOMIC_EXPORT):
+    """
+    Schreibt eine einzelne Datei. writer ist eine Funktion, welche den Inhalt in einen übergebenen Textstrom schreibt.
+    Mit atomic wie in write_files_atomic, jedoch mit fsync nur für diese Datei und ohne fsync auf das Verzeichnis.
+    """
+    if not atomic:
+        console("Schreibe", filename, mode="info")
+        with open(filename, "w", encoding='utf-8') as config_file:
+            writer(config_file)
+        return
+
+    batch = [_write_temporary_file(filename, writer)]
+    try:
+        _commit_batch(batch)
+    finally:
+        for descriptor, temporary_filename, _ in batch:
+            os.close(descriptor)
+            os.remove(temporary_filename)
+
+
+def write_files_parallel(contents, workers=EXPORT_WORKERS, atomic=ATOMIC_EXPORT, progress=None):
+    """
+    Schreibt Dateien wie write_files_atomic bzw. mit atomic=False direkt, jedoch mit write_file in einem Pool von
+    workers Threads. Bei None wird die Standardanzahl von ThreadPoolExecutor verwendet. Lohnt sich bei Dateisystemen mit
+    hoher Latenz pro Datei, z.B. NFS. Es werden höchstens viermal so viele Dateien gleichzeitig beauftragt wie Threads
+    vorhanden sind. Fehler werden pro Datei ausgegeben und brechen den Export nicht ab. Gibt die Menge der nicht
+    geschriebenen Dateien zurück.
+    """
+
+    failed_files = set()
+    directories = set()
+    pending = {}  # Future -> Tupel aus Dateiname und der Angabe, ob progress.advance() aufgerufen werden soll
+    limit = 4 * (workers or min(32, (os.cpu_count() or 1) + 4))
+
+    def collect(futures):
+        for future in futures:
+            filename, advance = pending.pop(future)
+            try:
+                future.result()
+                directories.add(os.path.dirname(filename) or ".")
+            except OSError as exception:
+                _add_failed_file(failed_files, filename, exception)
+            if advance and progress is not None:
+                progress.advance()
+
+    console("Schreibe Dateien parallel mit", workers or "der Standardanzahl von", "Threads.", mode="info")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for filename, writer, advance in contents:
+            if len(pending) >= limit:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            pending[executor.submit(write_file, filename, writer, atomic)] = (filename, advance)
+        collect(wait(pending).done)
+
+    if atomic:
+        fsync_directories(directories)
+
+    _report_failed_files(failed_files)
+
+    return failed_files
+
+
+def _add_failed_file(failed_files, filename, exception):
+    """
+    Gibt den Fehler beim Schreiben von filename aus und fügt filename der Menge failed_files hinzu.
+    """
+    console("Datei", filename, "konnte nicht geschrieben werden:", exception, mode="err", perm=True)
+    failed_files.add(filename)
+
+
+def _report_failed_files(failed_files):
+    """
+    Gibt eine Zusammenfassung der nicht geschriebenen Dateien aus, sofern vorhanden.
+    """
+    if len(failed_files) > 0:
+        console(len(failed_files), "Dateien konnten nicht geschrieben werden und bleiben als verändert markiert.",
+                mode="warn", perm=True)
+
+
+def fsync_directories(directories):
+    """
+    Schreibt die Verzeichniseinträge der Verzeichnisse in directories mit fsync auf den Datenträger. Erst danach sind
+    Umbenennungen mit os.replace dauerhaft. Unter Windows nicht möglich und daher ohne Wirkung.
+    """
+    if os.name != "posix":
+        return
+    for directory in directories:
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
+
+
+def _write_temporary_file(filename, writer):
+    """
+    Schreibt den Inhalt für filename mit writer in eine neue temporäre Datei im selben Verzeichnis und übernimmt die
+    Berechtigungen einer vorhandenen Datei filename. Gibt ein Tupel aus geöffnetem Dateideskriptor, temporärem
+    Dateinamen und filename zurück, vgl. _commit_batch.
+    """
+    # Temporäre Dateien beginnen mit einem Punkt und werden damit beim Import ignoriert
+    descriptor, temporary_filename = mkstemp(prefix=".", suffix=".tmp", dir=os.path.dirname(filename) or ".")
+    console("Schreibe", filename, mode="info")
+    try:
+        try:
+            os.chmod(temporary_filename, stat.S_IMODE(os.stat(filename).st_mode))
+        except FileNotFoundError:
+            pass
+        # Der Dateideskriptor bleibt für fsync geöffnet
+        with open(descriptor, "w", encoding='utf-8', closefd=False) as temporary_file:
+            writer(temporary_file)
+    except BaseException:
+        os.close(descriptor)
+        os.remove(temporary_filename)
+        raise
+    return descriptor, temporary_filename, filename
+
+
+def _commit_batch(batch, failed_files=None):
+    """
+    Schreibt die temporären Dateien in batch mit fsync auf den Datenträger und setzt sie an die Stelle der Zieldateien.
+    batch wird dabei geleert. Ist failed_files eine Menge, werden Fehler pro Datei darin gesammelt, andernfalls wird
+    der erste Fehler ausgelöst.
+    """
+    for entry in list(batch):
+        descriptor, temporary_filename, filename = entry
+        try:
+            os.fsync(descriptor)
+        except OSError as exception:
+            if failed_files is None:
+                raise
+            batch.remove(entry)
+            os.close(descriptor)
+            os.remove(temporary_filename)
+            _add_failed_file(failed_files, filename, exception)
+    while batch:
+        descriptor, temporary_filename, filename = batch.pop(0)
+        os.close(descriptor)
+        try:
+            os.replace(temporary_filename, filename)
+        except OSError as exception:
+            os.remove(temporary_filename)
+            if failed_files is None:
+                raise
+            _add_failed_file(failed_files, filename, exception)
 
 
 def config_to_str(server, choice):
@@ -91,63 +700,53 @@ def config_to_str(server, choice):
     Gibt ein String-Objekt zurück, welches die Konfiguration eines beliebigen Clients enthält. choice enthält die
     Angabe, welcher Client ausgegeben werden soll. 0 steht für den Server.
     """
+    config_str = io.StringIO()
+    write_config(server, choice, config_str)
+    return config_str.getvalue()
 
-    # Vorbereitung auf Prüfung auf Konfigurationsparameter der Peer-Sektion. Verwendung von CamelCase
-    peer_config_parameters = list(PEER_CONFIG_PARAMETERS)
 
-    config_str = ""
+def write_config(server, choice, stream=None, cache=True):
+    """
+    Schreibt die Konfiguration eines beliebigen Clients in den Textstrom stream, z.B. eine geöffnete Datei, sys.stdout
+    oder eine Pipe. Standard ist sys.stdout. choice enthält die Angabe, welcher Client ausgegeben werden soll. 0 steht
+    für den Server. Die Sektionen werden einzeln geschrieben, die Konfiguration liegt daher zu keinem Zeitpunkt
+    vollständig im Arbeitsspeicher vor. Bei einer ungültigen Angabe wird nichts geschrieben. Mit cache=False werden
+    bereits zwischengespeicherte Ausgaben verwendet, aber keine neuen abgelegt (vgl. server_peer_to_str). Die Exporte
+    nutzen dies, damit der Speicherbedarf nicht mit der Anzahl der Clients wächst.
+    """
+
+    if stream is None:
+        stream = sys.stdout
 
     try:
         client_id = int(choice)
     except ValueError:
         console("Eingabe einer Zahl erwartet.", perm=True, mode="err")
-        return ""
+        return
 
     if client_id == 0:
-        # Serverkonfiguration schreiben
-        config_str = config_str + interface_to_str(server)
-
-        # Clients hinterlegen: Bezeichnung, öffentlicher Schlüssel, IP-Adresse im VPN
+        # Serverkonfiguration: Interface-Sektion und eine Peer-Sektion pro Client mit Bezeichnung, öffentlichem
+        # Schlüssel und IP-Adresse im VPN
+        if DEBUG:
+            console("Schreibe", len(server.clients), "Peer-Sektionen mit folgenden Parametern:", "Name,",
+                    ", ".join(parameter for parameter, _ in SERVER_PEER_ACCESSORS), mode="info")
+        write = stream.write
+        write(interface_to_str(server))
         for client in server.clients:
-            console("Schreibe Peer-Sektion mit folgenden Parametern:", end="", mode="info")
-            config_str = config_str + "\n[Peer]\n"
-            if client.name != "":
-                config_str = config_str + "# Name = " + client.name + "\n"
-                console("", "Name", ", ", end="", quiet=True, no_space=True, mode="info")
-            for parameter in peer_config_parameters:
-                console("", parameter, ", ", end="", quiet=True, no_space=True, mode="info")
-                if getattr(client, "client_" + parameter.lower()) != "":
-                    config_str = config_str + parameter + " = " + str(getattr(client, "client_" + parameter.lower())) \
-                                 + "\n"
-            console(quiet=True, mode="info")  # Zeilenumbruch für detaillierte Ausgaben zum Programmablauf
-
-        return config_str
+            write(server_peer_to_str(client, cache))
+        return
 
     # else
     try:
         if len(server.clients) < client_id:
             console("Konfiguration", client_id, "existiert nicht", perm=True, mode="err")
-            return ""
+            return
     # Wenn das Attribut clients nicht vorhanden ist, ist server nicht von der Klasse ServerConfig
     except AttributeError:
         console("Keine Konfiguration im Arbeitsspeicher hinterlegt.", perm=True, mode="err")
-        return ""
-
-    config_str = config_str + interface_to_str(server.clients[client_id-1])
-
-    config_str = config_str + "\n[Peer]\n"
-    console("Die Peer-Sektion enthält folgende Parameter:", end="", mode="info")
-    if server.name != "":
-        config_str = config_str + "# Name = " + server.name + "\n"
-        console("", "Name", ", ", end="", quiet=True, no_space=True, mode="info")
-    for parameter in peer_config_parameters:
-        if getattr(server.clients[client_id-1], parameter.lower()) != "":
-            console("", parameter, ", ", end="", quiet=True, no_space=True, mode="info")
-            config_str = config_str + parameter + " = " + str(getattr(server.clients[client_id-1],
-                                                                      parameter.lower())) + "\n"
-    console(quiet=True, mode="info")  # Zeilenumbruch für detaillierte Ausgaben zum Programmablauf
+        return
 
-    return config_str
+    stream.write(client_config_to_str(server, server.clients[client_id-1], cache))
 
 
 def interface_to_str(peer):
@@ -155,26 +754,49 @@ def interface_to_str(peer):
     Gibt die Interface-Sektion eines Peers zurück. Ein Peer kann ein Server oder Client sein, beide haben den selben
     Parameterumfang in der Interface-Sektion.
     """
+    return section_to_str("[Interface]\n", peer.name, peer, INTERFACE_ACCESSORS)
 
-    # Vorbereitung auf Generierung einer Liste mit allen verfügbaren Parameternamen der Interface-Sektion. Verwendung
-    # von CamelCase
-    interface_config_parameters = list(INTERFACE_CONFIG_PARAMETERS)
 
-    config_interface_str = ""
-
-    config_interface_str = config_interface_str + "[Interface]\n"
+def server_peer_to_str(client, cache=True):
+    """
+    Gibt die Peer-Sektion eines Clients in der Serverkonfiguration zurück. Die Ausgabe wird im Client
+    zwischengespeichert und bei einer Änderung des Clients verworfen (vgl. ClientConfig.__setattr__). Mit cache=False
+    wird eine neue Ausgabe nicht zwischengespeichert.
+    """
+    rendered = client.rendered.get("server_peer")
+    if rendered is None:
+        rendered = section_to_str("\n[Peer]\n", client.name, client, SERVER_PEER_ACCESSORS)
+        if cache:
+            client.rendered["server_peer"] = rendered
+    return rendered
 
-    console("Die Interface-Sektion enthält folgende Parameter:", end="", mode="info")
 
-    if peer.name != "":
-        config_interface_str = config_interface_str + "# Name = " + peer.name + "\n"
-        console("", "Name", ", ", end="", quiet=True, no_space=True, mode="info")
+def client_config_to_str(server, client, cache=True):
+    """
+    Gibt die vollständige Konfiguration eines Clients zurück. Die Peer-Sektion enthält die Bezeichnung des Servers und
+    die Parameter aus der Clientkonfiguration, darunter den öffentlichen Schlüssel des Servers. Die Ausgabe wird wie in
+    server_peer_to_str zwischengespeichert, vgl. cache, und zusätzlich bei einer Änderung der Bezeichnung des Servers
+    verworfen.
+    """
+    rendered = client.rendered.get("config")
+    if rendered is None or rendered[0] != server.name:
+        rendered = (server.name, interface_to_str(client) + section_to_str("\n[Peer]\n", server.name, client,
+                                                                           PEER_ACCESSORS))
+        if cache:
+            client.rendered["config"] = rendered
+    return rendered[1]
 
-    for parameter in interface_config_parameters:
-        console("", parameter, ", ", end="", quiet=True, no_space=True, mode="info")
-        if getattr(peer, parameter.lower()) != "":
-            config_interface_str = config_interface_str + parameter + " = " + str(getattr(peer, parameter.lower())) + \
-                                   "\n"
-    console(quiet=True, mode="info")  # Zeilenumbruch für detaillierte Ausgaben zum Programmablauf
 
-    return config_interface_str
+def section_to_str(header, name, peer, accessors):
+    """
+    Gibt eine Sektion mit der Überschrift header, der Bezeichnung name als Kommentar und den Parametern aus accessors
+    zurück. Parameter mit leerem Wert werden nicht ausgegeben.
+    """
+    lines = [header]
+    if name != "":
+        lines.append("# Name = " + name + "\n")
+    for parameter, accessor in accessors:
+        value = accessor(peer)
+        if value != "":
+            lines.append(parameter + " = " + str(value) + "\n")
+    return "".join(lines)
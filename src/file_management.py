@@ -8,6 +8,7 @@ Enthält häufig verwendete Funktionen beim Umgang mit Dateien.
 # Imports aus Standardbibliotheken
 import os  # Für Dateisystemzugriffe
 from pathlib import Path  # Für Dateipfadangaben
+import stat  # Für die Auswertung von Dateiberechtigungen
 
 # Imports von Drittanbietern
 
@@ -55,3 +56,97 @@ def check_dir(dirname):
     # Prüfung, ob in das Verzeichnis geschrieben werden kann.
     if os.access(Path(dirname), os.W_OK) is not True:
         raise PermissionError(console("Das Verzeichnis", dirname, "ist nicht beschreibbar.", mode="err", perm=True))
+
+
+def get_file_signature(filename, stat_result=None):
+    """
+    Gibt die Merkmale (Größe, Zeitpunkt der letzten Änderung in Nanosekunden, Inode) einer Datei als Tupel zurück.
+    Stimmen die Merkmale überein, wird die Datei als unverändert betrachtet. Ein bereits vorhandenes Ergebnis von
+    os.stat() kann mit stat_result übergeben werden. Gibt None zurück, falls die Datei nicht existiert oder nicht
+    abgefragt werden kann.
+    """
+    if stat_result is None:
+        try:
+            stat_result = os.stat(filename)
+        except OSError:
+            return None
+
+    return stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino
+
+
+def get_credentials():
+    """
+    Gibt die effektive Benutzer-ID und die Menge der Gruppen-IDs des Prozesses für has_access zurück. Unter Windows
+    gibt es keine Benutzer- und Gruppen-IDs, dann wird None zurückgegeben.
+    """
+    if not hasattr(os, "geteuid"):
+        return None
+    return os.geteuid(), frozenset([os.getegid(), *os.getgroups()])
+
+
+def has_access(stat_result, mode, credentials):
+    """
+    Prüft anhand eines Ergebnisses von os.stat(), ob der Prozess die Berechtigung mode (os.R_OK oder os.W_OK) für die
+    Datei besitzt. Im Gegensatz zu os.access() ist dafür kein weiterer Systemaufruf notwendig. credentials ist das
+    einmalig ermittelte Ergebnis von get_credentials(). Ausgewertet werden nur die Berechtigungen des Dateisystems.
+    Rechte des Superusers und Zugriffssteuerungslisten (ACL) werden nicht berücksichtigt, ein negatives Ergebnis muss
+    daher mit os.access() bestätigt werden, vgl. scan_config_dir.
+    """
+    if mode == os.R_OK:
+        owner, group, other = stat.S_IRUSR, stat.S_IRGRP, stat.S_IROTH
+    else:
+        owner, group, other = stat.S_IWUSR, stat.S_IWGRP, stat.S_IWOTH
+
+    # Unter Windows geben die Berechtigungen des Besitzers das Schreibschutz-Attribut wieder
+    if credentials is None:
+        return bool(stat_result.st_mode & owner)
+
+    euid, groups = credentials
+    if stat_result.st_uid == euid:
+        return bool(stat_result.st_mode & owner)
+    if stat_result.st_gid in groups:
+        return bool(stat_result.st_mode & group)
+    return bool(stat_result.st_mode & other)
+
+
+def scan_config_dir(dirname, suffix=".conf"):
+    """
+    Durchsucht das Verzeichnis dirname in einem Durchlauf mit os.scandir() nach Dateien mit der Endung suffix. Die
+    Berechtigungen des Verzeichnisses werden einmalig geprüft (vgl. check_dir), die der Dateien anhand der bereits
+    ermittelten Ergebnisse von os.stat(). Nur bei einem negativen Ergebnis wird dieses mit os.access() bestätigt, z.B.
+    für den Superuser oder bei ACL. Bei NFS mit root_squash ist der Superuser damit nicht ausgenommen. Nicht lesbare
+    Dateien werden gesammelt gemeldet und übersprungen, nicht beschreibbare Dateien werden gesammelt gemeldet. Gibt ein
+    nach Dateipfaden sortiertes dict mit dem Dateipfad (dirname + Dateiname) als Schlüssel und dem Ergebnis von
+    os.stat() als Wert zurück.
+    """
+    check_dir(dirname)
+
+    files = {}
+    unreadable = []
+    not_writable = []
+    credentials = get_credentials()
+
+    with os.scandir(dirname) as entries:
+        for entry in entries:
+            # Versteckte Dateien werden wie bei glob ignoriert. is_file() benötigt keinen weiteren Systemaufruf.
+            if entry.name.startswith(".") or not entry.name.endswith(suffix) or not entry.is_file():
+                continue
+
+            # Das Ergebnis von stat() wird von DirEntry zwischengespeichert und weitergegeben
+            stat_result = entry.stat()
+            if not has_access(stat_result, os.R_OK, credentials) and not os.access(entry.path, os.R_OK):
+                unreadable.append(entry.name)
+                continue
+            if not has_access(stat_result, os.W_OK, credentials) and not os.access(entry.path, os.W_OK):
+                not_writable.append(entry.name)
+
+            files[dirname + entry.name] = stat_result
+
+    if len(unreadable) > 0:
+        console("Folgende Dateien in", dirname, "sind nicht lesbar und werden übersprungen:",
+                ", ".join(sorted(unreadable)), mode="err", perm=True)
+    if len(not_writable) > 0:
+        console("Folgende Dateien in", dirname, "sind nicht beschreibbar:", ", ".join(sorted(not_writable)),
+                mode="warn", perm=True)
+
+    return dict(sorted(files.items()))
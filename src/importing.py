@@ -6,7 +6,11 @@ Enthält alle Funktionen für das Importieren von Konfigurationen auf dem Dateis
 # pylint: disable=import-error
 
 # Imports aus Standardbibliotheken
-import glob  # Für das Auffinden von Konfigurationsdateien mittels Wildcard
+from concurrent.futures import ProcessPoolExecutor  # Für den parallelen Import von Clientkonfigurationen
+import copy  # Für die Übernahme unveränderter Konfigurationen aus einem vorherigen Import
+from itertools import repeat
+import multiprocessing  # Für die Startmethode der Prozesse
+import os
 import re  # Für das Parsen von Konfigurationsdateien
 from ipaddress import IPv4Interface, ip_address  # Für Berechnungen der Netzwerktechnik
 
@@ -15,49 +19,90 @@ from ipaddress import IPv4Interface, ip_address  # Für Berechnungen der Netzwer
 # Eigene Imports
 from config_management import calculate_publickey
 from constants import CONFIG_PARAMETERS
+from constants import DEBUG
+from constants import IMPORT_WORKERS
+from constants import LAZY_CLIENT_CONFIG
+from constants import LAZY_PEER_INDEX
+from constants import PROCESS_START_METHOD
 from constants import WG_DIR
 from constants import MINIMAL_CONFIG_PARAMETERS
 from constants import SERVER_CONFIG_FILENAME
 from constants import PEER_CONFIG_PARAMETERS
+from constants import RE_MATCH_CONFIG_LINE
 from debugging import console
 from client_config import ClientConfig
+from client_config import LazyClientConfig
 from file_management import check_file
-from file_management import check_dir
+from file_management import get_file_signature
+from file_management import scan_config_dir
+from keys import key_to_bytes
+from networking import build_address_allocator
+from networking import is_host_in_network
 from server_config import ServerConfig
 from peer import Peer
+from peer_index import PeerIndex
+from progress import Progress
 
+# Vorkompilierter regulärer Ausdruck für die Klassifizierung einer Zeile, vgl. RE_MATCH_CONFIG_LINE
+RE_CONFIG_LINE = re.compile(RE_MATCH_CONFIG_LINE)
 
-def parse_and_import(peer):
+# Parameternamen in Kleinbuchstaben. Werden einmalig beim Laden des Moduls berechnet.
+CONFIG_PARAMETERS_LOWER = frozenset(parameter.lower() for parameter in CONFIG_PARAMETERS)
+PEER_CONFIG_PARAMETERS_LOWER = frozenset(parameter.lower() for parameter in PEER_CONFIG_PARAMETERS)
+MINIMAL_PARAMETERS_LOWER = frozenset(parameter.lower() for parameter in MINIMAL_CONFIG_PARAMETERS)
+
+
+def parse_and_import(peer, clients_by_publickey=None, peer_sections=None, check=True, identity_only=False):
     """
     Schreibt die Werte der Parameter einer Datei in die Datenstruktur. peer kann ein Client oder Server sein.
-    Der Parameter peer.filename von peer muss einen validen Pfad zu einer Konfigurationsdatei enthalten.
+    Der Parameter peer.filename von peer (bei einer LazyClientConfig peer.source_filename) muss einen validen Pfad zu
+    einer Konfigurationsdatei enthalten.
+    Jede Zeile wird mit einem einzigen vorkompilierten regulären Ausdruck (RE_CONFIG_LINE) klassifiziert.
+    Bei einer Serverkonfiguration werden die Peer-Sektionen über clients_by_publickey den Clients zugeordnet. Wird kein
+    Verzeichnis übergeben, wird es aus peer.clients erstellt. Wird eine Liste peer_sections übergeben, werden die
+    eingelesenen Peer-Sektionen als Peer-Objekte darin abgelegt. Ist peer_sections ein PeerIndex der Datei, wird nur
+    die Interface-Sektion eingelesen und die Peer-Sektionen werden bei der Zuordnung einzeln aus dem Index erstellt.
+    Mit check=False entfällt die Prüfung der Datei, z.B. wenn diese bereits mit scan_config_dir geprüft wurde.
+    Bei einer LazyClientConfig und identity_only=True endet der Import, sobald Bezeichnung, Address und PrivateKey
+    eingelesen sind. Die Position in der Datei wird in peer.rest_offset hinterlegt. Ein späterer Aufruf mit
+    identity_only=False setzt den Import an dieser Position fort.
     """
 
+    # Eine LazyClientConfig liest stets aus der Datei des Imports, auch wenn filename inzwischen geändert wurde
+    filename = peer.source_filename if isinstance(peer, LazyClientConfig) else peer.filename
+
     # Parameterprüfungen
-    try:
-        check_file(peer.filename)
-    except OSError:  # Superklasse von FileNotFoundError, PermissionError und NotADirectoryError
-        console("Breche ab.", mode="err", perm=True)
-        return None
+    if check:
+        try:
+            check_file(filename)
+        except OSError:  # Superklasse von FileNotFoundError, PermissionError und NotADirectoryError
+            console("Breche ab.", mode="err", perm=True)
+            return None
 
     # Vorbereitung, "deklarieren" der peer_config Variable für das Sammeln und Übertragen von Parametern einer
     # Peer-Sektion
     client_data = ""
 
-    # Vorbereitung auf Generierung einer Liste mit allen verfügbaren Parameternamen in Kleinbuchstaben
-    config_parameters = [parameter.lower() for parameter in CONFIG_PARAMETERS]
+    # Vorbereitung auf die Prüfung auf Vollständigkeit der notwendigen Parameter
+    minimal_parameters = set(MINIMAL_PARAMETERS_LOWER)
 
-    # Vorbereitung auf Prüfung auf Konfigurationsparameter der Peer-Sektion
-    peer_config_parameters = [parameter.lower() for parameter in PEER_CONFIG_PARAMETERS]
+    # Fortsetzen des Imports einer LazyClientConfig. Die notwendigen Parameter wurden bereits eingelesen.
+    identity_only = identity_only and isinstance(peer, LazyClientConfig)
+    resume = isinstance(peer, LazyClientConfig) and not identity_only and peer.rest_offset
+    if resume:
+        minimal_parameters.clear()
 
-    # Vorbereitung auf die Prüfung auf Vollständigkeit der notwendigen Parameter
-    minimal_parameters = [parameter.lower() for parameter in MINIMAL_CONFIG_PARAMETERS]
+    # Eingelesene Peer-Sektionen einer Serverkonfiguration
+    if peer_sections is None:
+        peer_sections = []
 
     # Fallunterscheidung: soll eine Server- oder Clientkonfiguration importiert werden?
     is_server = False
     if isinstance(peer, ServerConfig):
         is_server = True
         console("Serverkonfiguration erkannt", mode="succ")
+        if clients_by_publickey is None:
+            clients_by_publickey = index_clients_by_publickey(peer.clients)
         if peer.filename != WG_DIR + SERVER_CONFIG_FILENAME:
             console("Serverkonfiguration", peer.filename, "entspricht nicht dem Standard",
                     WG_DIR + SERVER_CONFIG_FILENAME, mode="info")
@@ -67,34 +112,42 @@ def parse_and_import(peer):
         console("Ungültige Datenstruktur vom Typ", type(peer), "übergeben.", mode="err")
 
     # Öffnen der Datei
-    with open(peer.filename, encoding='utf-8') as config:
-        # Datei Zeile für Zeile einlesen
-        console("Lese Datei", peer.filename, mode="info")
-        for line in config:
-            # Zeile ohne \n ausgeben
-            console("Lese Zeile", line.replace('\n', ''), mode="info")
-            # Die Zeile wird auf Bestandteile der Syntax untersucht: leer, Kommentar, Sektion oder Name-Wert Paar
-            match = re.search(r'^ *$', line)  # Leere Zeile darf keine oder nur Leerzeichen enthalten
+    with open(filename, encoding='utf-8') as config:
+        # Datei Zeile für Zeile einlesen. Bei einem PeerIndex nur die Zeilen der Interface-Sektion.
+        console("Lese Datei", filename, mode="info")
+        lines = peer_sections.interface_lines() if isinstance(peer_sections, PeerIndex) else config
+        if resume:
+            config.seek(peer.rest_offset)
+        if identity_only:
+            # Bei zeilenweisem Einlesen mit readline() kann die Position in der Datei mit tell() ermittelt werden
+            lines = iter(config.readline, "")
+        for line in lines:
+            line = line.rstrip("\n")
+
+            # Die Zeile wird in einem Durchlauf auf Bestandteile der Syntax untersucht: leer, Kommentar, Sektion oder
+            # Name-Wert Paar. Die Art der Zeile ergibt sich aus der zuletzt gefüllten Gruppe.
+            match = RE_CONFIG_LINE.match(line)
+            kind = match.lastgroup if match else None
+
+            # Ausgaben zum Programmablauf werden nur bei aktiviertem DEBUG vorbereitet
+            if DEBUG:
+                console("Lese Zeile", line, mode="info")
+
             # Bei leerer Zeile: fahre fort
-            if match:
-                console("Zeile enthält keine Konfiguration.", mode="succ")
+            if kind == "blank":
                 continue
 
-            match = re.search(r'^\[.*]$', line)
             # Bei Sektion: Unterscheide zwischen Server und Client. Client: fahre fort. Server: Importiere Daten in die
             # Datenstruktur des Clients.
-            if match:
-                console("Zeile leitet eine INI-Sektion ein.", mode="succ")
-
+            if kind == "section":
                 # Hier können vier Fälle vorliegen: Client und [Interface], Client und [Peer], Server und [Interface]
                 # sowie Server und [Peer]. In den ersten drei genannten Fällen kann die Zeile mit der Sektionsdefinition
                 # ignoriert werden, es gibt in den beiden Sektionen keine doppelten Parameter. Die Parameter können
                 # daher problemlos einer Sektion zugeordnet werden. Sonderfall Server und [Peer]: diese kommt so häufig
                 # vor, wie es Clients gibt. Daher muss diese vollständig erfasst und abgespeichert werden.
-
-                match = re.search(r'^ *\[Peer] *$', line, re.IGNORECASE)
-                if match and is_server:
-                    console("Zeile leitet eine Peer-Sektion ein.", mode="succ")
+                if is_server and line.lower() == "[peer]":
+                    if DEBUG:
+                        console("Zeile leitet eine Peer-Sektion ein.", mode="succ")
 
                     # Die Daten werden zeilenweise eingelesen. Eine Peer-Sektion besteht aus unbekannt vielen Zeilen.
                     # Um die Daten zu einem peer zu sammeln, muss also zeilenübergreifend gearbeitet werden. Die Daten
@@ -104,87 +157,125 @@ def parse_and_import(peer):
                     # kann der öffentliche Schlüssel berechnet werden. Die Daten werden für den Client hinterlegt,
                     # dessen errechneter öffentlicher Schlüssel mit dem des hinterlegten übereinstimmt.
 
-                    # Zuerst werden Daten aus dem Objekt client_data gesichert, falls notwendig
-                    if isinstance(client_data, Peer):
-                        # peer ist hier immer ein Objekt der Klasse ServerConfig
-                        assign_peer_to_client(client_data, peer)
-
-                    # Danach wird ein neues Objekt angelegt
+                    # Es wird ein neues Objekt angelegt. In den folgenden Durchläufen werden clientspezifische Daten in
+                    # dem Objekt gesammelt. Nach Ende der Datei werden alle Peer-Sektionen mit assign_peers_to_clients
+                    # in die Datenstruktur übernommen.
                     client_data = Peer()
-
-                    # In den folgenden Durchläufen werden clientspezifische Daten in dem Objekt gesammelt, bis diese
-                    # mit der oben aufgerufenen Funktion assign_peer_to_client in die Datenstruktur übernommen werden.
-
+                    peer_sections.append(client_data)
                 continue
 
-            match = re.search(r'^#', line)
             # Bei Kommentar: der erste Kommentar gibt die Bezeichnung des Clients an
             # Die Bezeichnung ist kein offizieller Parameter (aber ein INI-Standard) und wird daher gesondert
             # behandelt.
-            if match:
-                console("Kommentar erkannt", mode="succ")
+            if kind == "comment":
                 if peer.name == "":
                     # Rauten (#), Leerzeichen sowie ein ggf. voranstehendes 'Name =' werden entfernt
-                    peer.name = line.replace('\n', '').replace("Name", "").replace("=", "").replace("#", "").strip()
-                    console("Bezeichnung", peer.name, "hinterlegt.", mode="succ")
-                else:
+                    peer.name = line.replace("Name", "").replace("=", "").replace("#", "").strip()
+                    if DEBUG:
+                        console("Bezeichnung", peer.name, "hinterlegt.", mode="succ")
+                elif DEBUG:
                     console("Es sind mehrere kommentierte Zeilen in der Datei vorhanden. Der erste Kommentar wurde als "
                             "Bezeichnung interpretiert, dieser und folgende Kommentare werden ignoriert.", mode="info")
+
+                # Die übrigen Parameter werden bei einer LazyClientConfig erst bei Bedarf eingelesen
+                if identity_only and peer.name != "" and len(minimal_parameters) == 0:
+                    peer.rest_offset = config.tell()
+                    return None
                 continue
 
-            match = re.search("^([^ ]*) *= *(.*)", line, re.IGNORECASE)
-            # Name und Wert werden ohne Leerzeichen zur Weiterverarbeitung gespeichert
-            key = re.split("^([^ ]*) *= *(.*)", line, re.IGNORECASE)[1].strip()
-            value = re.split("^([^ ]*) *= *(.*)", line, re.IGNORECASE)[2].strip()
-            console("Parameter", key, "mit Wert", value, "erkannt.", mode="succ")
             # Bei Name-Wert Paar: Prüfe, ob der Parameter ein unterstützter offizieller Parameter ist
-            if match:
-                console("Prüfe, ob der Parameter in der Menge der unterstützten Parameter enthalten ist.", mode="info")
+            if kind == "value":
+                # Name und Wert werden ohne Leerzeichen zur Weiterverarbeitung gespeichert
+                key = match.group("key").strip().lower()
+                value = match.group("value").strip()
+                if DEBUG:
+                    console("Parameter", key, "mit Wert", value, "erkannt.", mode="succ")
+
                 # Prüfe, ob der Parameter Teil einer Peer-Sektion einer Serverkonfiguration ist
-                if key.lower() in peer_config_parameters and is_server:
+                if is_server and key in PEER_CONFIG_PARAMETERS_LOWER:
                     # Falls ja, Parameter nicht im peer-Objekt hinterlegen, sondern im client_data Objekt vorhalten
-                    setattr(client_data, key.lower(), value)
-                    console("Ein Parameter aus einer Server-Peer Sektion wurde für die spätere Verarbeitung "
-                            "zurückgestellt.", mode="succ")
+                    if isinstance(client_data, Peer):
+                        setattr(client_data, key, value)
+                    else:
+                        console("Der Parameter in Zeile", line, "steht außerhalb einer Peer-Sektion und wird "
+                                "ignoriert.", mode="warn", perm=True)
 
                 # Sonst: prüfe, ob der Parameter grundsätzlich gültig ist
-                elif key.lower() in config_parameters:
-                    # Falls ja, übernehme den Wert des Parameters in der Datenstruktur
-                    setattr(peer, key.lower(), value)
-                    console("Parameter hinterlegt.", mode="succ")
-                    # "Streiche" den Parameter von der Liste der notwendigen Parameter, falls vorhanden
-                    if key.lower() in minimal_parameters:
-                        console("Parameter", key.lower(), "war in der Liste der notwendigen Parameter enthalten",
-                                mode="succ")
-                        minimal_parameters.remove(key.lower())
+                elif key in CONFIG_PARAMETERS_LOWER:
+                    # Beim Fortsetzen des Imports einer LazyClientConfig bleiben bereits im Arbeitsspeicher geänderte
+                    # Werte erhalten
+                    if resume and key in vars(peer):
+                        continue
+
+                    # Falls ja, übernehme den Wert des Parameters in der Datenstruktur und "streiche" den Parameter von
+                    # der Liste der notwendigen Parameter, falls vorhanden
+                    setattr(peer, key, value)
+                    minimal_parameters.discard(key)
+
+                    # Die übrigen Parameter werden bei einer LazyClientConfig erst bei Bedarf eingelesen
+                    if identity_only and peer.name != "" and len(minimal_parameters) == 0:
+                        peer.rest_offset = config.tell()
+                        return None
 
                 # Falls nein: gebe eine entsprechende Warnung aus
                 else:
-                    console("Kein gültiger Parameter in Zeile", line.replace('\n', ''), "erkannt", mode="err",
-                            perm=True)
+                    console("Kein gültiger Parameter in Zeile", line, "erkannt", mode="err", perm=True)
                 continue
 
             # Ist keine Übereinstimmung zu finden, ist die Zeile ungültig
-            console("Die Zeile ist ungültig:", line.replace('\n', ''), mode="err", perm=True)
+            console("Die Zeile ist ungültig:", line, mode="err", perm=True)
+
+        # Ist das Ende der Datei erreicht, wurden alle Parameter einer LazyClientConfig eingelesen
+        if identity_only:
+            peer.complete()
 
         # Sobald das Ende der Datei erreicht ist, prüfe ob notwendige Konfigurationsparameter importiert wurden
         if len(minimal_parameters) > 0:
-            console("Datei", re.split(WG_DIR, peer.filename)[1], "enthält nicht die erforderlichen Parameter",
+            console("Datei", re.split(WG_DIR, filename)[-1], "enthält nicht die erforderlichen Parameter",
                     MINIMAL_CONFIG_PARAMETERS, mode="warn", perm=True)
 
-        # und für den Fall, dass eine Peer-Sektion endet: übertrage Daten von client_data in das server Objekt.
-        if isinstance(client_data, Peer):  # Falls eine Peer-Sektion verarbeitet wurde
-            assign_peer_to_client(client_data, peer)  # peer ist in diesem Fall immer ein Objekt der Klasse ServerConfig
+        # und für den Fall, dass Peer-Sektionen vorhanden sind: übertrage die Daten in die Clients des server Objekts.
+        if is_server:
+            assign_peers_to_clients(peer_sections, clients_by_publickey)
 
         # PEP 8: Either all return statements in a function should return an expression, or none of them should.
         return None
 
 
-def assign_peer_to_client(client_data, server):
+def index_clients_by_publickey(clients):
+    """
+    Erstellt ein Verzeichnis (dict) der Clients mit den Bytes des öffentlichen Schlüssels client_publickey (vgl.
+    ClientConfig.get_raw_key) als Schlüssel. Damit ist die Zuordnung einer Peer-Sektion zu einem Client mit einem
+    einzigen Zugriff möglich. Mehrfach vorkommende Schlüssel werden gesammelt in einer Meldung ausgegeben, zugeordnet
+    wird jeweils der zuerst importierte Client.
+    """
+    clients_by_publickey = {}
+    duplicates = []
+
+    for client in clients:
+        # Der Vergleich erfolgt über die Bytes der Schlüssel, vgl. KeyAttribute
+        publickey = client.get_raw_key("client_publickey")
+        if publickey == "":
+            continue
+        if publickey in clients_by_publickey:
+            duplicates.append(client.name if client.name != "" else client.filename)
+            continue
+        clients_by_publickey[publickey] = client
+
+    if len(duplicates) > 0:
+        console("Folgende", len(duplicates), "Clients verwenden denselben öffentlichen Schlüssel wie ein bereits "
+                "importierter Client und werden bei der Zuordnung der Peer-Sektionen nicht berücksichtigt:",
+                ", ".join(duplicates), mode="warn", perm=True)
+
+    return clients_by_publickey
+
+
+def assign_peer_to_client(client_data, clients_by_publickey):
     """
     client_data enthält Konfigurationsparameter aus der Peer-Sektion einer Serverkonfiguration. Die Daten müssen einem
-    bereits importierten Client anhand des öffentlichen Schlüssels zugeordnet werden. Dazu wird das Attribut publickey
-    der Objekte in server.clients[] mit dem Attribut client_data.publickey verglichen.
+    bereits importierten Client anhand des öffentlichen Schlüssels zugeordnet werden. Dazu wird client_data.publickey
+    im Verzeichnis clients_by_publickey (vgl. index_clients_by_publickey) nachgeschlagen. Gibt den zugeordneten Client
+    zurück oder None, falls keine Zuordnung möglich ist.
     """
 
     # Prüfung, ob client_data einen öffentlichen Schlüssel enthält
@@ -205,53 +296,195 @@ def assign_peer_to_client(client_data, server):
         else:
             print("")  # Zeilenumbruch
 
-    # Falls ein öffentlicher Schlüssel hinterlegt wurde, diesen mit den vorhandenen Schlüsseln abgleichen
+        return None
+
+    # Falls ein öffentlicher Schlüssel hinterlegt wurde, diesen im Verzeichnis der Clients nachschlagen
+    client = clients_by_publickey.get(key_to_bytes(client_data.publickey))
+    if client is None:
+        return None
+
+    if DEBUG:
+        console("Übereinstimmung für den öffentlichen Schlüssel", client_data.publickey, "gefunden", mode="succ")
+
+    for parameter in PEER_CONFIG_PARAMETERS:
+        # Die Parameter aus den Peer-Sektionen der Serverkonfiguration werden clientspezifisch gespeichert. Da in den
+        # Konfigurationen der Clients auch eine Peer-Sektion vorkommt, wird den Parametern aus der Serverkonfiguration
+        # ein 'client_' vorangestellt.
+        setattr(client, "client_" + parameter.lower(), getattr(client_data, parameter.lower()))
+
+    return client
+
+
+def assign_peers_to_clients(peer_sections, clients_by_publickey):
+    """
+    Überträgt die Parameter aller Peer-Sektionen einer Serverkonfiguration in die passenden Clients (vgl.
+    assign_peer_to_client). peer_sections ist eine Liste von Peer-Objekten oder ein PeerIndex. Nicht zuordenbare
+    Peer-Sektionen und Clients werden gesammelt gemeldet.
+    """
+
+    # Bei einem PeerIndex wird nur auf die Peer-Sektionen der vorhandenen Clients zugegriffen
+    if isinstance(peer_sections, PeerIndex):
+        unassigned_clients = []
+        for client in clients_by_publickey.values():
+            client_data = peer_sections.get(client.client_publickey)
+            if client_data is None:
+                unassigned_clients.append(client)
+            else:
+                assign_peer_to_client(client_data, clients_by_publickey)
+
+        if peer_sections.sections_without_publickey > 0:
+            console(peer_sections.sections_without_publickey, "Peer-Sektionen aus der Serverkonfiguration enthalten "
+                    "keinen Wert für PublicKey und können keinem Client zugeordnet werden.", mode="warn", perm=True)
+
+        report_unassigned_peers([publickey for publickey in peer_sections.keys()
+                                 if key_to_bytes(publickey) not in clients_by_publickey], unassigned_clients)
+        return
+
+    # Öffentliche Schlüssel der Peer-Sektionen ohne passenden Client
+    orphaned_publickeys = []
+
+    # Noch nicht zugeordnete Clients. Zugeordnete Clients werden während der Zuordnung entfernt.
+    unassigned_clients = dict(clients_by_publickey)
+
+    for client_data in peer_sections:
+        if assign_peer_to_client(client_data, clients_by_publickey) is None and client_data.publickey != "":
+            orphaned_publickeys.append(client_data.publickey)
+        unassigned_clients.pop(key_to_bytes(client_data.publickey), None)
+
+    report_unassigned_peers(orphaned_publickeys, list(unassigned_clients.values()))
+
+
+def report_unassigned_peers(orphaned_publickeys, unassigned_clients):
+    """
+    Gibt eine zusammenfassende Meldung über Peer-Sektionen ohne passenden Client (orphaned_publickeys) und Clients ohne
+    passende Peer-Sektion in der Serverkonfiguration (unassigned_clients) aus.
+    """
+    if len(orphaned_publickeys) > 0:
+        console(len(orphaned_publickeys), "Peer-Sektionen konnten keinem Client zugeordnet werden, da kein "
+                "übereinstimmender öffentlicher Schlüssel in der Konfiguration enthalten ist. Das Schlüsselpaar ist "
+                "ungültig oder die Konfigurationsdatei ist nicht mehr vorhanden. Bitte in der Serverkonfiguration",
+                WG_DIR + SERVER_CONFIG_FILENAME, "die Sektionen mit folgenden öffentlichen Schlüsseln prüfen:",
+                ", ".join(orphaned_publickeys), "Die Sektionen werden andernfalls beim nächsten Export verworfen.",
+                mode="warn", perm=True)
+
+    if len(unassigned_clients) > 0:
+        console(len(unassigned_clients), "Clients sind in der Serverkonfiguration nicht als Peer hinterlegt:",
+                ", ".join(client.name if client.name != "" else client.filename for client in unassigned_clients),
+                mode="warn", perm=True)
+
+
+def import_client_config(filename, check=True, lazy=LAZY_CLIENT_CONFIG):
+    """
+    Importiert die Clientkonfiguration in der Datei filename und gibt ein ClientConfig-Objekt zurück. Der öffentliche
+    Schlüssel des Clients wird berechnet und die IP-Adresse in ein IPv4Address-Objekt umgewandelt. Die Funktion ist
+    unabhängig von anderen Clients und kann daher auch in einem eigenen Prozess ausgeführt werden. check wird an
+    parse_and_import weitergegeben. Mit lazy wird eine LazyClientConfig erstellt, von welcher zunächst nur
+    Bezeichnung, Address und PrivateKey eingelesen werden.
+    """
+
+    client = LazyClientConfig() if lazy else ClientConfig()
+
+    # Der Dateipfad wird in der Datenstruktur hinterlegt
+    client.filename = filename
+    if lazy:
+        # Die übrigen Parameter dürfen später nur aus der unveränderten Datei eingelesen werden, vgl. LazyClientConfig
+        client.source_filename = filename
+        client.signature = get_file_signature(filename)
+
+    # Import der Parameter
+    parse_and_import(client, check=check, identity_only=lazy)
+
+    # Berechnung und Ergänzung des öffentlichen Schlüssels in der Konfiguration im Arbeitsspeicher. Notwendig für die
+    # spätere Zuordnung der Peer-Sektionen aus der Serverkonfiguration.
+    calculate_publickey(client)
+
+    # Anpassung des Parameters address in den Clientkonfigurationen. Das Zeichenketten-Objekt wird in ein
+    # IP4Interface-Objekt umgewandelt.
+    client.address = ip_address(IPv4Interface(client.address).ip)
+    console("IP-Adresse", client.address, "erfasst.", mode="succ")
+
+    # Die Konfiguration entspricht der Datei
+    client.dirty = False
+
+    return client
+
+
+def iter_client_configs(wg_dir=WG_DIR):
+    """
+    Generator, welcher die Clientkonfigurationen im Verzeichnis wg_dir nacheinander importiert und als
+    ClientConfig-Objekte inkl. berechnetem öffentlichen Schlüssel zurückgibt (vgl. import_client_config). Im Gegensatz
+    zu import_configurations wird immer nur ein Client im Arbeitsspeicher gehalten und keine Serverkonfiguration
+    erstellt. Die Verarbeitung kann jederzeit abgebrochen werden, z.B. für Auswertungen sehr großer Verzeichnisse.
+    Die Reihenfolge entspricht der von import_configurations.
+    """
+
+    try:
+        files = scan_config_dir(wg_dir)
+    except OSError:  # Superklasse von FileNotFoundError, PermissionError und NotADirectoryError
+        console("Breche ab.", mode="err", perm=True)
+        return
+
+    for filename in files:
+        # Die Serverkonfiguration wird übersprungen
+        if filename == wg_dir + SERVER_CONFIG_FILENAME:
+            continue
+
+        yield import_client_config(filename, check=False)
+
+
+def import_client_configs(filenames, workers=IMPORT_WORKERS, lazy=LAZY_CLIENT_CONFIG):
+    """
+    Generator, welcher die Clientkonfigurationen in filenames mit import_client_config importiert und in der
+    Reihenfolge von filenames zurückgibt. workers gibt die Anzahl der Prozesse an, bei 1 erfolgt der Import seriell,
+    bei None wird die Anzahl der Prozessorkerne verwendet. Die Dateien müssen bereits geprüft worden sein.
+    """
+    if workers is None or workers > 1:
+        number_of_workers = workers or os.cpu_count() or 1
+        console("Importiere Clientkonfigurationen parallel mit", number_of_workers, "Prozessen.", mode="info")
+        with ProcessPoolExecutor(max_workers=number_of_workers,
+                                 mp_context=multiprocessing.get_context(PROCESS_START_METHOD)) as executor:
+            # map() gibt die Ergebnisse in der Reihenfolge der übergebenen Dateinamen zurück. Mehrere Dateien werden
+            # pro Auftrag an einen Prozess übergeben, um den Aufwand für die Kommunikation gering zu halten.
+            chunksize = max(1, len(filenames) // (4 * number_of_workers))
+            yield from executor.map(import_client_config, filenames, repeat(False), repeat(lazy), chunksize=chunksize)
     else:
-        # Vorbereitung für den Programmablauf nach erfolgreicher Übertragung der Parameter in das server-Objekt
-        success = False
+        yield from map(import_client_config, filenames, repeat(False), repeat(lazy))
 
-        console("Zuordnung der Client-Sektion zu vorhandenen Clients.", mode="info")
-        for client in server.clients:
-            console("Vergleiche Schlüssel aus der Peer-Sektion", client_data.publickey, "mit hinterlegtem Schlüssel",
-                    client.client_publickey, "...", mode="info")
-            if client.client_publickey == client_data.publickey:
-                console("Übereinstimmung gefunden", mode="succ")
-                # Daten übertragen
-                console("Beginne mit der Übertragung der Parameter", mode="info")
-                for parameter in PEER_CONFIG_PARAMETERS:
-                    # Die Parameter aus den Peer-Sektionen der Serverkonfiguration werden clientspezifisch gespeichert.
-                    # Da in den Konfigurationen der Clients auch eine Peer-Sektion vorkommt, wird den Parametern aus
-                    # der Serverkonfiguration ein 'client_' vorangestellt.
-                    setattr(client, "client_" + parameter.lower(), getattr(client_data, parameter.lower()))
-                console("Parameter erfolgreich übernommen", mode="succ")
-                success = True
-
-        if not success:
-            console("Eine Peer-Sektion konnte keinem Client zugeordnet werden, da kein übereinstimmender öffentlicher "
-                    "Schlüssel in der Konfiguration enthalten ist. Das Schlüsselpaar ist ungültig oder die "
-                    "Konfigurationsdatei ist nicht mehr vorhanden. Bitte in der Serverkonfiguration", WG_DIR +
-                    SERVER_CONFIG_FILENAME, "die Sektion mit dem öffentlichen Schlüssel", client_data.publickey,
-                    "prüfen. Die Clientkonfiguration wird andernfalls beim nächsten Export verworfen.", mode="warn",
-                    perm=True)
-
-
-def import_configurations():
+
+def import_configurations(workers=IMPORT_WORKERS, previous=None, lazy_peers=LAZY_PEER_INDEX,
+                          lazy_clients=LAZY_CLIENT_CONFIG):
     """
-    Importiert alle VPN-Konfigurationen im Wireguard-Verzeichnis.
+    Importiert alle VPN-Konfigurationen im Wireguard-Verzeichnis. workers gibt die Anzahl der Prozesse für den Import
+    der Clientkonfigurationen an. Bei 1 erfolgt der Import seriell, bei None wird die Anzahl der Prozessorkerne
+    verwendet.
+    Wird mit previous die ServerConfig eines vorherigen Imports übergeben, werden nur neue und seit dem vorherigen
+    Import veränderte Dateien eingelesen (vgl. ServerConfig.manifest). Für unveränderte Dateien werden Kopien der
+    damals importierten Objekte inkl. der berechneten öffentlichen Schlüssel verwendet.
+    Mit lazy_peers werden die Peer-Sektionen der Serverkonfiguration über einen PeerIndex nur für die vorhandenen
+    Clients eingelesen. Mit lazy_clients werden von den Clientkonfigurationen zunächst nur Bezeichnung, Address und
+    PrivateKey eingelesen, vgl. LazyClientConfig.
     """
 
     server = ServerConfig()
 
+    # Fortschrittsanzeige. Die Anzahl der Clients ist erst nach dem Durchsuchen des Verzeichnisses bekannt.
+    progress = Progress("Import", 0)
+
+    # Manifest des vorherigen Imports. Einträge unveränderter Dateien werden in das neue Manifest übernommen.
+    previous_manifest = previous.manifest if isinstance(previous, ServerConfig) else {}
+
+    # Einlesen der Konfigurationsdateien *.conf
+
+    # Verzeichnis in einem Durchlauf durchsuchen. Die Ergebnisse von os.stat() werden für das Manifest weiterverwendet.
     try:
-        check_dir(WG_DIR)
+        with progress.phase("Verzeichnis"):
+            files = scan_config_dir(WG_DIR)
     except OSError:  # Superklasse von FileNotFoundError, PermissionError und NotADirectoryError
         console("Breche ab.", mode="err", perm=True)
         return None
 
-    # Einlesen der Konfigurationsdateien *.conf
-
     # Liste mit Dateinamen erstellen
-    list_client_configuration_filenames = glob.glob(f"{WG_DIR}*.conf")
+    list_client_configuration_filenames = list(files)
 
     # Dateiname der Serverkonfiguration ausschließen und damit prüfen, ob diese existiert
     try:
@@ -259,44 +492,92 @@ def import_configurations():
     except ValueError:
         console("Keine Serverkonfiguration", "wg0.conf", "gefunden.", mode="warn", perm=True)
 
-    # Zu importierende Clientkonfigurationen anzeigen
-    console("Neben der Serverkonfiguration wurden folgende Clientkonfigurationen gefunden:",
-            list_client_configuration_filenames, mode="info")
+    # Anzahl der zu importierenden Clientkonfigurationen anzeigen
+    console("Neben der Serverkonfiguration wurden", len(list_client_configuration_filenames),
+            "Clientkonfigurationen gefunden.", mode="info")
+    progress.total = len(list_client_configuration_filenames)
 
     # Konfigurationen importieren
 
-    # ..der Clients
-    for file in list_client_configuration_filenames:
-
-        # Für jede gefundene Clientkonfiguration wird dem Server-Objekt ein ClientConfig-Objekt hinzugefügt.
-        server.clients.append(ClientConfig())
-
-        # Der Dateipfad wird in der Datenstruktur hinterlegt
-        server.clients[-1].filename = file
+    # ..der Clients. Die Reihenfolge der Clients entspricht unabhängig von der Anzahl der Prozesse der sortierten
+    # Reihenfolge der Dateinamen (vgl. scan_config_dir).
+
+    # Unveränderte Clients werden aus dem vorherigen Import übernommen, alle anderen Dateien werden eingelesen
+    signatures = {}
+    clients_by_filename = {}
+    list_changed_filenames = []
+    for filename in list_client_configuration_filenames:
+        signatures[filename] = get_file_signature(filename, files[filename])
+        entry = previous_manifest.get(filename)
+        if entry is not None and signatures[filename] is not None and entry[0] == signatures[filename]:
+            server.manifest[filename] = entry
+            clients_by_filename[filename] = copy.copy(entry[1])
+        else:
+            list_changed_filenames.append(filename)
 
-        # Import der Parameter
-        parse_and_import(server.clients[-1])
+    progress.advance(len(clients_by_filename))
 
-        # Berechnung und Ergänzung des öffentlichen Schlüssels in der Konfiguration im Arbeitsspeicher. Notwendig für
-        # die spätere Zuordnung der Peer-Sektionen aus der Serverkonfiguration.
-        calculate_publickey(server.clients[-1])
+    with progress.phase("Clients"):
+        imported_clients = import_client_configs(list_changed_filenames, workers, lazy_clients)
+        for filename, client in zip(list_changed_filenames, imported_clients):
+            # Im Manifest wird eine Kopie hinterlegt, damit spätere Änderungen im Arbeitsspeicher diese nicht verändern
+            server.manifest[filename] = (signatures[filename], copy.copy(client))
+            clients_by_filename[filename] = client
+            progress.advance()
 
-        # Anpassung des Parameters address in den Clientkonfigurationen. Das Zeichenketten-Objekt wird in ein
-        # IP4Interface-Objekt umgewandelt.
-        server.clients[-1].address = ip_address(IPv4Interface(server.clients[-1].address).ip)
-        console("IP-Adresse", server.clients[-1].address, "erfasst.", mode="succ")
+    # Für jede gefundene Clientkonfiguration wird dem Server-Objekt ein ClientConfig-Objekt hinzugefügt.
+    server.clients = [clients_by_filename[filename] for filename in list_client_configuration_filenames]
 
+    if DEBUG:
         console("Folgende Clients wurden importiert:", mode="succ")
         for client in server.clients:
             console("Client", str(client.name), "mit privatem Schlüssel", str(client.privatekey), mode="succ",
                     quiet=True)
 
-    # ..des Servers
-    try:
-        parse_and_import(server)
-    except OSError:
-        console("Breche ab.", mode="err", perm=True)
-        return None
+    if len(previous_manifest) > 0:
+        console(len(list_client_configuration_filenames) - len(list_changed_filenames),
+                "Clientkonfigurationen sind seit dem letzten Import unverändert,", len(list_changed_filenames),
+                "wurden neu eingelesen.", mode="info", perm=True)
+
+    # Verzeichnis der öffentlichen Schlüssel einmalig nach dem Import der Clients erstellen. Die Peer-Sektionen der
+    # Serverkonfiguration werden damit in konstanter Zeit zugeordnet.
+    clients_by_publickey = index_clients_by_publickey(server.clients)
+
+    # ..des Servers. Ist die Datei unverändert, werden die Parameter der Interface-Sektion und die Peer-Sektionen aus
+    # dem vorherigen Import übernommen.
+    with progress.phase("Server"):
+        signature = get_file_signature(server.filename, files.get(server.filename))
+        entry = previous_manifest.get(server.filename)
+        if entry is not None and signature is not None and entry[0] == signature:
+            server_snapshot, peer_sections = entry[1]
+            for key, value in vars(server_snapshot).items():
+                if key not in ("clients", "manifest", "removed_filenames", "addresses"):
+                    setattr(server, key, value)
+            if isinstance(peer_sections, PeerIndex):
+                # Die Datei ist unverändert, der geschlossene PeerIndex wird für die Zuordnung erneut abgebildet
+                with peer_sections:
+                    assign_peers_to_clients(peer_sections, clients_by_publickey)
+            else:
+                assign_peers_to_clients(peer_sections, clients_by_publickey)
+        else:
+            # Bei sehr großen Serverkonfigurationen werden die Peer-Sektionen nur indiziert, vgl. PeerIndex
+            peer_sections = PeerIndex(server.filename) if lazy_peers and server.filename in files else []
+            try:
+                parse_and_import(server, clients_by_publickey, peer_sections)
+            except OSError:
+                console("Breche ab.", mode="err", perm=True)
+                return None
+            finally:
+                # Die Abbildung der Datei wird freigegeben, damit diese z.B. unter Windows ersetzt werden kann. Im
+                # Manifest verbleiben nur die Bereiche der Peer-Sektionen.
+                if isinstance(peer_sections, PeerIndex):
+                    peer_sections.close()
+            server_snapshot = copy.copy(server)
+            server_snapshot.clients = []
+            server_snapshot.manifest = {}
+            server_snapshot.removed_filenames = []
+            server_snapshot.addresses = None
+        server.manifest[server.filename] = (signature, (server_snapshot, peer_sections))
 
     # Anpassung des Parameters address in der Serverkonfiguration. Das Zeichenketten-Objekt wird in ein
     # IP4Interface-Objekt umgewandelt. Dieses enthält eine IPv4-Adresse inkl. Maske.
@@ -305,12 +586,25 @@ def import_configurations():
         console("Das VPN-Netzwerk ist kein von der IANA für private Zwecke reserviertes Netzwerk.", mode="warn",
                 perm=True)
 
-    # Prüfung, ob die IP-Adressen der Clients im Subnetz des Servers liegen
-    index = 0
-    for client in server.clients:
-        index = index + 1
-        if client.address not in list(server.address.network.hosts()):
-            console("IP-Adresse", client.address.ip, "von", "Client" + str(index), "ist nicht Teil des VPN-Netzwerks",
-                    server.address.network, mode="warn", perm=True, no_space=False)
+    # Prüfung, ob die IP-Adressen der Clients im Subnetz des Servers liegen und eindeutig sind
+    with progress.phase("Prüfung"):
+        index = 0
+        for client in server.clients:
+            index = index + 1
+            if not is_host_in_network(client.address, server.address.network):
+                console("IP-Adresse", client.address, "von", "Client" + str(index), "ist nicht Teil des VPN-Netzwerks",
+                        server.address.network, mode="warn", perm=True, no_space=False)
+
+        # Die belegten Hostadressen werden für die Vergabe neuer Adressen erfasst, vgl. get_address_allocator
+        server.addresses, conflicts = build_address_allocator(server.address.network, server.address.ip,
+                                                              server.clients)
+        for index in conflicts:
+            console("Es liegt ein IP-Adresskonflikt vor.", "Client" + str(index), "verwendet eine bereits vergebene "
+                    "IP-Adresse.", mode="warn", perm=True)
+
+    # Die Konfiguration entspricht den Dateien, vgl. export_configurations
+    server.dirty = False
+
+    progress.finish()
 
     return server
@@ -13,6 +13,9 @@ The WireGuard class implements some of wireguard-tools' cryptographic
 
 # Imports aus Standardbibliotheken
 import base64
+import queue
+import threading
+from typing import List, NamedTuple
 
 # Imports von Drittanbietern
 from cryptography.hazmat.primitives import serialization
@@ -53,3 +56,150 @@ def pubkey(privkey: str) -> str:
             format=serialization.PublicFormat.Raw,
         )
     ).decode()
+
+
+class Keypair(NamedTuple):
+    """WireGuard keypair in raw and base64 encoded form"""
+
+    private_bytes: bytes
+    public_bytes: bytes
+    privatekey: str
+    publickey: str
+
+
+def generate_keypairs(number: int) -> List[Keypair]:
+    """generate WireGuard keypairs
+
+    The public key is derived directly from the generated private key
+    object, each key is base64 encoded exactly once.
+
+    Args:
+        number (int): number of keypairs to generate
+
+    Returns:
+        List[Keypair]: generated keypairs
+    """
+    keypairs = []
+    for _ in range(number):
+        private_key = X25519PrivateKey.generate()
+        private_bytes = private_key.private_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PrivateFormat.Raw,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        public_bytes = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw,
+        )
+        keypairs.append(
+            Keypair(
+                private_bytes,
+                public_bytes,
+                base64.b64encode(private_bytes).decode(),
+                base64.b64encode(public_bytes).decode(),
+            )
+        )
+    return keypairs
+
+
+class KeyPool:
+    """pool of pre-generated WireGuard keypairs
+
+    A daemon thread keeps up to size keypairs available. The thread is
+    started on first use. If the pool is empty, get() generates a keypair
+    inline instead of waiting. Every keypair is handed out only once.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._keypairs = queue.Queue(maxsize=size)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """start the refill thread if it is not running yet"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._refill, name="KeyPool", daemon=True
+                )
+                self._thread.start()
+
+    def _refill(self):
+        while True:
+            # blocks while the pool is full
+            self._keypairs.put(generate_keypairs(1)[0])
+
+    def get(self) -> Keypair:
+        """return a keypair from the pool
+
+        Returns:
+            Keypair: unused keypair
+        """
+        self.start()
+        try:
+            return self._keypairs.get_nowait()
+        except queue.Empty:
+            return generate_keypairs(1)[0]
+
+    def get_many(self, number: int) -> List[Keypair]:
+        """return number keypairs, taken from the pool as far as available
+
+        Args:
+            number (int): number of keypairs
+
+        Returns:
+            List[Keypair]: unused keypairs
+        """
+        self.start()
+        keypairs = []
+        while len(keypairs) < number:
+            try:
+                keypairs.append(self._keypairs.get_nowait())
+            except queue.Empty:
+                break
+        return keypairs + generate_keypairs(number - len(keypairs))
+
+
+def key_to_bytes(key):
+    """convert a base64 encoded WireGuard key into its 32 raw bytes
+
+    Values that are not a canonical base64 encoding of 32 bytes (e.g. an
+    empty string) are returned unchanged, raw keys are passed through.
+
+    Args:
+        key: base64 encoded key, raw key or any other value
+
+    Returns:
+        bytes or the unchanged value
+    """
+    if isinstance(key, bytes) and len(key) == 32:
+        return key
+    if not isinstance(key, str) or len(key) != 44:
+        return key
+    try:
+        raw = base64.b64decode(key, validate=True)
+    except ValueError:
+        return key
+    if len(raw) != 32 or base64.b64encode(raw).decode() != key:
+        return key
+    return raw
+
+
+def public_bytes(private_bytes: bytes) -> bytes:
+    """derive the raw public key from a raw private key
+
+    Args:
+        private_bytes (bytes): raw X25519 private key
+
+    Returns:
+        bytes: raw public key
+    """
+    return (
+        X25519PrivateKey.from_private_bytes(private_bytes)
+        .public_key()
+        .public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw,
+        )
+    )
@@ -27,13 +27,15 @@ from config_management import change_client_keypair
 from config_management import change_network_size
 from config_management import create_server_config
 from config_management import delete_client
+from config_management import generate_qr_codes
 from config_management import insert_client
 from config_management import print_qr_code
 from config_management import server_config_exists
+from constants import QR_OUTPUT_DIR
 from constants import WG_DIR
 from debugging import console
 from exporting import export_configurations
-from exporting import config_to_str
+from exporting import write_config
 from file_management import check_dir
 
 
@@ -106,7 +108,8 @@ def main():
                     console("Vorgang abgebrochen", mode="info", perm=True)
                     continue
             try:
-                server = import_configurations()
+                # Unveränderte Dateien werden aus dem vorherigen Import übernommen
+                server = import_configurations(previous=server)
             except OSError:
                 console("Vorgang abgebrochen.", mode="info", perm=True)
             console("Verbindungen importiert.", mode="succ")
@@ -125,7 +128,8 @@ def main():
                     break
                 if choice == ".":
                     continue
-                print(config_to_str(server, choice))
+                write_config(server, choice)
+                print()
         elif option == "3":
             if server is None:
                 console("Keine Serverkonfiguration vorhanden. Soll eine neue Konfiguration im Arbeitsspeicher angelegt "
@@ -207,12 +211,17 @@ def main():
                 change_network_size(server, choice)
         elif option == "8":
             if server_config_exists(server):
-                console("Welche Clientkonfiguration soll ausgegeben werden?", mode="info", perm=True)
+                console("Welche Clientkonfiguration soll ausgegeben werden?", "*",
+                        "erzeugt Bilddateien für alle Clients.", mode="info", perm=True)
                 try:
                     choice = input(f"{Style.BRIGHT}QR-Code ausgeben (Auswahl) > {Style.RESET_ALL}")
                 except UnicodeDecodeError:
                     console("Ungültige Eingabe. Bitte keine Akzente eingeben.", mode="err", perm=True)
                     continue
+                if choice == "*":
+                    generate_qr_codes(server, output_dir=WG_DIR + QR_OUTPUT_DIR)
+                    console("QR-Codes abgelegt in", WG_DIR + QR_OUTPUT_DIR, mode="succ", perm=True)
+                    continue
                 print_qr_code(server, choice)
         elif option == "9":
             if server_config_exists(server):
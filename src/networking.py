@@ -6,6 +6,7 @@ Diese Datei enthält Funktionen, welche zur Berechnung von IPv4-Netzwerken ("sub
 # pylint: disable=import-error
 
 # Imports aus Standardbibliotheken
+from ipaddress import ip_address  # Für die Umwandlung von Ganzzahlen in IP-Adressen
 
 # Imports von Drittanbietern
 
@@ -29,3 +30,130 @@ def get_cidr_mask_from_hosts(number_of_hosts):
     console("Es ist nicht möglich, mehr als 2^24-2 Clients in einem privaten IPv4-Subnetz unterzubringen. Bitte eine "
             "kleinere Menge angeben.", mode="err")
     return None
+
+
+def get_host_range(network):
+    """
+    Gibt die erste und letzte nutzbare Hostadresse eines IPv4-Netzwerks als Ganzzahlen zurück. Die Werte entsprechen
+    der ersten und letzten Adresse von network.hosts(), ohne die Adressen im Arbeitsspeicher aufzuzählen.
+    """
+    network_address = int(network.network_address)
+    broadcast_address = int(network.broadcast_address)
+
+    # Bei /31 (Punkt-zu-Punkt, RFC 3021) und /32 sind alle Adressen des Netzwerks nutzbar
+    if network.prefixlen >= network.max_prefixlen - 1:
+        return network_address, broadcast_address
+
+    return network_address + 1, broadcast_address - 1
+
+
+def is_host_in_network(address, network):
+    """
+    Prüft mit einem Vergleich von Ganzzahlen, ob address eine nutzbare Hostadresse in network ist. Gleichbedeutend mit
+    address in network.hosts(), aber mit konstantem Zeit- und Speicherbedarf.
+    """
+    first_host, last_host = get_host_range(network)
+    return address.version == network.version and first_host <= int(address) <= last_host
+
+
+class AddressAllocator:
+    """
+    Verwaltet die belegten Hostadressen eines IPv4-Netzwerks in einer Bitmap mit einem Bit pro Hostadresse, für ein /8
+    Netzwerk werden 2 MiB benötigt. Die Suche nach der nächsten freien Adresse beginnt an einer Position, vor der alle
+    Adressen belegt sind. Diese wird nur bei einer Freigabe zurückgesetzt, vollständig belegte Bytes werden als Ganzes
+    übersprungen. Dadurch ist der Aufwand pro vergebener Adresse im Mittel konstant.
+    Adressen außerhalb der nutzbaren Hostadressen werden nicht erfasst.
+    """
+
+    def __init__(self, network):
+        self.network = network  # Das verwaltete Netzwerk, z.B. server.address.network.
+        self.first_host, self.last_host = get_host_range(network)
+        self.size = self.last_host - self.first_host + 1  # Anzahl der nutzbaren Hostadressen.
+        self.bitmap = bytearray((self.size + 7) // 8)  # Ein gesetztes Bit entspricht einer belegten Hostadresse.
+        self.used = 0  # Anzahl der belegten Hostadressen.
+        self.duplicates = {}  # Position -> Anzahl zusätzlicher Belegungen bei IP-Adresskonflikten.
+        self.cursor = 0  # Vor dieser Position sind alle Hostadressen belegt.
+
+    def _offset(self, address):
+        """
+        Gibt die Position von address in der Bitmap zurück, bzw. None, falls address keine nutzbare Hostadresse des
+        Netzwerks ist.
+        """
+        if getattr(address, "version", None) != self.network.version:
+            return None
+        offset = int(address) - self.first_host
+        if 0 <= offset < self.size:
+            return offset
+        return None
+
+    def __contains__(self, address):
+        offset = self._offset(address)
+        return offset is not None and self.bitmap[offset >> 3] >> (offset & 7) & 1 == 1
+
+    def reserve(self, address):
+        """
+        Belegt address. Gibt False zurück, falls address bereits belegt war (IP-Adresskonflikt), sonst True.
+        """
+        offset = self._offset(address)
+        if offset is None:
+            return True
+        mask = 1 << (offset & 7)
+        if self.bitmap[offset >> 3] & mask:
+            self.duplicates[offset] = self.duplicates.get(offset, 0) + 1
+            return False
+        self.bitmap[offset >> 3] |= mask
+        self.used += 1
+        return True
+
+    def release(self, address):
+        """
+        Gibt address frei. Bei einem IP-Adresskonflikt bleibt die Adresse belegt, bis alle Belegungen freigegeben sind.
+        """
+        offset = self._offset(address)
+        if offset is None or address not in self:
+            return
+        if offset in self.duplicates:
+            self.duplicates[offset] -= 1
+            if self.duplicates[offset] == 0:
+                del self.duplicates[offset]
+            return
+        self.bitmap[offset >> 3] &= ~(1 << (offset & 7)) & 0xFF
+        self.used -= 1
+        self.cursor = min(self.cursor, offset)
+
+    def next_free(self):
+        """
+        Gibt die nächste freie Hostadresse zurück, ohne sie zu belegen, bzw. None, falls das Netzwerk voll belegt ist.
+        """
+        offset = self.cursor
+        while offset < self.size:
+            byte = self.bitmap[offset >> 3]
+            if byte == 0xFF:
+                offset = (offset | 7) + 1
+            elif byte >> (offset & 7) & 1:
+                offset += 1
+            else:
+                self.cursor = offset
+                return ip_address(self.first_host + offset)
+        self.cursor = self.size
+        return None
+
+    def allocate(self):
+        """
+        Belegt die nächste freie Hostadresse und gibt sie zurück, bzw. None, falls das Netzwerk voll belegt ist.
+        """
+        address = self.next_free()
+        if address is not None:
+            self.reserve(address)
+        return address
+
+
+def build_address_allocator(network, server_address, clients):
+    """
+    Erstellt einen AddressAllocator für network und belegt die Adresse des Servers sowie die Adressen aller Clients.
+    Gibt den AddressAllocator und eine Liste der Nummern (ab 1) der Clients zurück, deren Adresse bereits belegt war.
+    """
+    addresses = AddressAllocator(network)
+    addresses.reserve(server_address)
+    conflicts = [index for index, client in enumerate(clients, 1) if not addresses.reserve(client.address)]
+    return addresses, conflicts
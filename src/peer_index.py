@@ -0,0 +1,165 @@
+"""
+Enthält einen Index der Peer-Sektionen einer Serverkonfiguration auf Basis einer in den Arbeitsspeicher abgebildeten
+Datei (mmap). Für sehr große Serverkonfigurationen mit zehntausenden Peer-Sektionen.
+"""
+
+# Es gibt ein Problem mit der Erkennung von lokalen Modulen durch pylint. Daher:
+# pylint: disable=import-error
+
+# Imports aus Standardbibliotheken
+import mmap  # Für das Abbilden der Datei in den Arbeitsspeicher
+import re  # Für das Auffinden der Sektionsgrenzen
+
+# Imports von Drittanbietern
+
+# Eigene Imports
+from constants import PEER_CONFIG_PARAMETERS
+from constants import RE_MATCH_CONFIG_LINE
+from debugging import console
+from peer import Peer
+
+# Regulärer Ausdruck für das Auffinden der Peer-Sektionen und ihrer öffentlichen Schlüssel in einem Durchlauf über die
+# gesamte Datei. Die Gruppe section ist bei einer Zeile [Peer] gefüllt, die Gruppe publickey enthält den Wert einer
+# Zeile PublicKey = Wert. Es gelten dieselben Regeln wie beim zeilenweisen Import (vgl. RE_MATCH_CONFIG_LINE).
+RE_PEER_INDEX = re.compile(rb"^(?:(?P<section>\[peer])|publickey *= *(?P<publickey>.*?)) *\r?$",
+                           re.MULTILINE | re.IGNORECASE)
+
+# Vorkompilierter regulärer Ausdruck für die Klassifizierung einer Zeile, vgl. RE_MATCH_CONFIG_LINE
+RE_CONFIG_LINE = re.compile(RE_MATCH_CONFIG_LINE)
+
+# Parameternamen der Peer-Sektion in Kleinbuchstaben
+PEER_CONFIG_PARAMETERS_LOWER = frozenset(parameter.lower() for parameter in PEER_CONFIG_PARAMETERS)
+
+
+class PeerIndex:
+    """
+    Index der Peer-Sektionen einer Serverkonfiguration. Die Datei wird in den Arbeitsspeicher abgebildet und einmalig
+    nach Sektionsgrenzen durchsucht. Hinterlegt wird pro öffentlichem Schlüssel nur der Bereich der Sektion in der
+    Datei. Ein Peer-Objekt wird erst beim Zugriff auf einen Schlüssel erstellt. Verhält sich wie ein nur lesbares dict
+    mit dem öffentlichen Schlüssel als Schlüssel und einem Peer-Objekt als Wert.
+    Die Datei darf während der Verwendung des Index nicht verändert, sondern nur ersetzt werden. Nach close() bleiben
+    die Bereiche erhalten, mit open() bzw. with kann eine unveränderte Datei erneut abgebildet werden.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename  # Der Dateiname der Serverkonfiguration.
+        self.sections = {}  # Öffentlicher Schlüssel -> (Anfang, Ende) der Peer-Sektion in der Datei in Bytes.
+        self.interface_end = 0  # Ende der Interface-Sektion bzw. Anfang der ersten Peer-Sektion in Bytes.
+        self.sections_without_publickey = 0  # Anzahl der Peer-Sektionen ohne öffentlichen Schlüssel.
+        self._mapping = None  # Die in den Arbeitsspeicher abgebildete Datei, None nach close().
+
+        self.open()
+        self._build()
+
+    def open(self):
+        """
+        Bildet die Datei in den Arbeitsspeicher ab, sofern dies nicht bereits geschehen ist.
+        """
+        if self._mapping is not None:
+            return
+        with open(self.filename, "rb") as config_file:
+            try:
+                self._mapping = mmap.mmap(config_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Leere Dateien können nicht abgebildet werden
+                self._mapping = b""
+
+    def _build(self):
+        """
+        Durchsucht die Datei nach Peer-Sektionen und hinterlegt deren Bereiche.
+        """
+        section_start = None
+        publickey = None
+        duplicates = 0
+
+        for match in RE_PEER_INDEX.finditer(self._mapping):
+            if match.group("section") is not None:
+                if section_start is None:
+                    self.interface_end = match.start()
+                else:
+                    duplicates += self._add_section(publickey, section_start, match.start())
+                section_start = match.start()
+                publickey = None
+            elif section_start is not None and publickey is None:
+                publickey = match.group("publickey").decode("utf-8")
+
+        if section_start is None:
+            self.interface_end = len(self._mapping)
+        else:
+            duplicates += self._add_section(publickey, section_start, len(self._mapping))
+
+        if duplicates > 0:
+            console(duplicates, "Peer-Sektionen in", self.filename, "verwenden einen bereits vorhandenen öffentlichen "
+                    "Schlüssel und werden ignoriert.", mode="warn", perm=True)
+
+    def _add_section(self, publickey, start, end):
+        """
+        Hinterlegt den Bereich einer Peer-Sektion. Gibt 1 zurück, falls der öffentliche Schlüssel bereits hinterlegt
+        war, sonst 0.
+        """
+        if publickey is None or publickey == "":
+            self.sections_without_publickey += 1
+            return 0
+        if publickey in self.sections:
+            return 1
+        self.sections[publickey] = (start, end)
+        return 0
+
+    def interface_lines(self):
+        """
+        Gibt die Zeilen der Interface-Sektion ohne Zeilenumbruch als Liste zurück.
+        """
+        return self._mapping[:self.interface_end].decode("utf-8").splitlines()
+
+    def __getitem__(self, publickey):
+        """
+        Erstellt ein Peer-Objekt aus der Peer-Sektion mit dem öffentlichen Schlüssel publickey.
+        """
+        start, end = self.sections[publickey]
+        peer = Peer()
+        for line in self._mapping[start:end].decode("utf-8").splitlines():
+            match = RE_CONFIG_LINE.match(line)
+            if match and match.lastgroup == "value":
+                key = match.group("key").strip().lower()
+                if key in PEER_CONFIG_PARAMETERS_LOWER:
+                    setattr(peer, key, match.group("value").strip())
+        return peer
+
+    def get(self, publickey, default=None):
+        """
+        Wie __getitem__, gibt aber default zurück, falls keine Peer-Sektion mit diesem Schlüssel existiert.
+        """
+        if publickey not in self.sections:
+            return default
+        return self[publickey]
+
+    def __contains__(self, publickey):
+        return publickey in self.sections
+
+    def __len__(self):
+        return len(self.sections)
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def keys(self):
+        """
+        Gibt die öffentlichen Schlüssel aller Peer-Sektionen zurück.
+        """
+        return self.sections.keys()
+
+    def close(self):
+        """
+        Gibt die Abbildung der Datei und damit auch die Datei selbst frei. Danach ist bis zum nächsten open() kein
+        Zugriff auf Peer-Sektionen mehr möglich.
+        """
+        if isinstance(self._mapping, mmap.mmap):
+            self._mapping.close()
+        self._mapping = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
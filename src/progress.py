@@ -0,0 +1,96 @@
+"""
+Enthält die Fortschrittsanzeige für lang laufende Vorgänge wie Import und Export.
+"""
+
+# Es gibt ein Problem mit der Erkennung von lokalen Modulen durch pylint. Daher:
+# pylint: disable=import-error
+
+# Imports aus Standardbibliotheken
+from contextlib import contextmanager
+import sys
+import time
+
+# Imports von Drittanbietern
+
+# Eigene Imports
+from constants import DEBUG
+from constants import PROGRESS_INTERVAL
+from debugging import console
+
+
+class Progress:
+    """
+    Fortschrittsanzeige mit Zähler, Durchsatz und geschätzter Restdauer. Auf einem interaktiven Terminal wird eine
+    Zeile fortlaufend überschrieben, andernfalls (z.B. bei Umleitung in eine Logdatei) wird jeweils eine neue Zeile
+    ausgegeben. Ausgaben erfolgen höchstens alle PROGRESS_INTERVAL Sekunden, kurze Vorgänge bleiben daher ohne
+    Ausgabe. Mit finish() wird eine Zusammenfassung inkl. der Dauer der einzelnen Phasen ausgegeben.
+    """
+
+    def __init__(self, description, total, stream=None):
+        self.description = description  # Bezeichnung des Vorgangs, z.B. "Import".
+        self.total = total  # Erwartete Anzahl von Elementen.
+        self.count = 0  # Anzahl der bereits verarbeiteten Elemente.
+        self.phases = {}  # Dauer der einzelnen Phasen in Sekunden, in der Reihenfolge ihres Beginns.
+        self.stream = stream if stream is not None else sys.stdout
+        self.interactive = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.start = time.perf_counter()
+        self.last_output = self.start
+        self.has_output = False  # Gibt an, ob bereits ein Zwischenstand ausgegeben wurde.
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Kontextmanager für die Zeitmessung einer Phase. Mehrfach verwendete Phasen werden aufsummiert.
+        """
+        phase_start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - phase_start
+
+    def advance(self, amount=1):
+        """
+        Erhöht den Zähler um amount und gibt ggf. einen Zwischenstand aus.
+        """
+        self.count += amount
+        now = time.perf_counter()
+        if now - self.last_output >= PROGRESS_INTERVAL:
+            self.last_output = now
+            self._write(self.status(now))
+
+    def status(self, now=None):
+        """
+        Gibt den aktuellen Stand als Zeichenkette zurück: Zähler, Durchsatz und geschätzte Restdauer.
+        """
+        elapsed = (now if now is not None else time.perf_counter()) - self.start
+        throughput = self.count / elapsed if elapsed > 0 else 0.0
+        status = f"{self.description}: {self.count}/{self.total} ({throughput:,.0f}/s"
+        if 0 < throughput and self.count < self.total:
+            status += f", noch ca. {(self.total - self.count) / throughput:.0f} s"
+        return status + ")"
+
+    def _write(self, text):
+        """
+        Gibt einen Zwischenstand aus. Auf einem Terminal wird die vorherige Ausgabe überschrieben.
+        """
+        if self.interactive:
+            self.stream.write(f"\r\033[K{text}")
+        else:
+            self.stream.write(text + "\n")
+        self.stream.flush()
+        self.has_output = True
+
+    def finish(self):
+        """
+        Schließt die Anzeige ab und gibt eine Zusammenfassung aus, sofern der Vorgang länger als PROGRESS_INTERVAL
+        gedauert hat oder DEBUG aktiv ist.
+        """
+        elapsed = time.perf_counter() - self.start
+        if self.has_output and self.interactive:
+            self.stream.write("\r\033[K")
+            self.stream.flush()
+
+        if elapsed >= PROGRESS_INTERVAL or DEBUG:
+            phases = ", ".join(f"{name} {duration:.2f} s" for name, duration in self.phases.items())
+            console(f"{self.description}: {self.count} in {elapsed:.2f} s", f"({phases})" if phases else "",
+                    mode="info", perm=True)
@@ -37,3 +37,7 @@ class ServerConfig:
         self.predown = ""  # Auszuführende Programme vor dem Verbindungsabbau
         self.postdown = ""  # Auszuführende Programme nach dem Verbindungsabbau
         self.clients = []  # Liste der verwandten Client-Konfigurationen.
+        self.manifest = {}  # Dateimerkmale und Ergebnisse des letzten Imports pro Datei, vgl. import_configurations.
+        self.dirty = True  # Gibt an, ob die Konfiguration seit dem letzten Import oder Export verändert wurde.
+        self.removed_filenames = []  # Dateien entfernter oder umbenannter Clients, werden beim Export entfernt.
+        self.addresses = None  # Belegte Hostadressen im VPN-Netzwerk, vgl. get_address_allocator.